@@ -0,0 +1,200 @@
+import os
+import sys
+import argparse
+import statistics
+from timeit import default_timer as timer
+import common as c
+import branch
+import parallel
+import instrument
+import runner
+import solution_cache
+
+script_dir = os.path.dirname(__file__)
+input_dir = os.path.join(script_dir, "vc-exact-public")
+basic_file = os.path.join(script_dir, "basic.txt")
+reference_file = os.path.join(script_dir, "ilp_output.txt")
+
+# tiers by number of edges as listed in basic.txt
+TIERS = ["easy", "medium", "hard"]
+EASY_EDGES = 1000
+MEDIUM_EDGES = 50000
+
+# a run is a slowdown if its median time exceeds the baseline by this
+# factor and by at least NOISE seconds, and likewise for node counts
+SLOWDOWN = 1.25
+NOISE = 0.05
+
+HEADER = ["file_name", "status", "vc_size", "nodes", "run_time", "min_time", "max_time"]
+
+# names of the instances in input_dir in each tier
+def tiers(path=basic_file):
+    result = {t: [] for t in TIERS}
+    for name, (v, e, avg_deg) in c.read_table(path).items():
+        if not os.path.exists(os.path.join(input_dir, name)):
+            continue
+        e = int(e)
+        if e <= EASY_EDGES:
+            result["easy"].append(name)
+        elif e <= MEDIUM_EDGES:
+            result["medium"].append(name)
+        else:
+            result["hard"].append(name)
+    return {t: sorted(names) for t, names in result.items()}
+
+# known optimal VC sizes, leaving out the instances the ILP did not solve
+def reference(path=reference_file):
+    known = {}
+    for name, fields in c.read_table(path).items():
+        if fields and int(fields[0]) > 0:
+            known[name] = int(fields[0])
+    return known
+
+# each solver reads one instance file and returns (status, VC, nodes), the
+# VC being the best one found, also on timeout, and nodes None if the solver
+# does not count them
+def run_branch(f, timeout):
+    g = c.parse_graph(f, compact=True)
+    profile = instrument.Profile()
+    try:
+        return ("ok", branch.solve(g, profile, timeout=timeout), profile.nodes)
+    except ValueError as err:
+        return ("timeout", err.args[1], profile.nodes)
+
+def run_auto(f, timeout):
+    g = c.parse_graph(f, compact=True)
+    profile = instrument.Profile()
+    try:
+        return ("ok", branch.solve(g, profile, timeout=timeout, method="auto"), profile.nodes)
+    except ValueError as err:
+        return ("timeout", err.args[1], profile.nodes)
+
+def run_clique(f, timeout):
+    g = c.parse_graph(f, compact=True)
+    try:
+        return ("ok", branch.solve(g, timeout=timeout, method="clique"), None)
+    except ValueError as err:
+        return ("timeout", err.args[1], None)
+
+def run_parallel(f, timeout):
+    g = c.parse_graph(f, compact=True)
+    try:
+        return ("ok", parallel.solve(g, timeout=timeout), None)
+    except ValueError as err:
+        return ("timeout", err.args[1], None)
+
+def run_ilp(f, timeout):
+    g = c.parse_graph(f, compact=True)
+    try:
+        return ("ok", branch.solve(g, timeout=timeout, method="ilp"), None)
+    except ValueError as err:
+        return ("timeout", err.args[1], None)
+
+SOLVERS = {
+    "branch": run_branch,
+    "auto": run_auto,
+    "clique": run_clique,
+    "parallel": run_parallel,
+    "ilp": run_ilp,
+}
+
+# run statuses from best to worst; a VC that is no cover of the instance
+# makes the run invalid
+STATUSES = ["ok", "timeout", "invalid", "error"]
+
+# run solver reps times on every instance, in this process one after
+# another so that runs do not compete for the CPU
+# a row has the worst status of its runs, the largest VC size among the
+# covers that check out, "-" if none does, and the median node count
+# returns the result rows by file name, with the median, min and max time
+def bench(solver, names, reps=3, timeout=None):
+    results = {}
+    for name in names:
+        path = os.path.join(input_dir, name)
+        with open(path, encoding="latin-1") as f:
+            n, edges = c.load_edges(f)
+        times = []
+        statuses = []
+        sizes = []
+        counts = []
+        for _ in range(reps):
+            with open(path, encoding="latin-1") as f:
+                start = timer()
+                try:
+                    status, vc, nodes = SOLVERS[solver](f, timeout)
+                except Exception:
+                    status, vc, nodes = "error", None, None
+                times.append(timer() - start)
+            if nodes is not None:
+                counts.append(nodes)
+            if vc is not None and solution_cache.is_cover(n, edges, vc):
+                sizes.append(len(set(vc)))
+            elif status != "error":
+                status = "invalid"
+            statuses.append(status)
+        results[name] = [max(statuses, key=STATUSES.index), max(sizes, default="-"),
+                         round(statistics.median(counts)) if counts else "-",
+                         round(statistics.median(times), 5), round(min(times), 5),
+                         round(max(times), 5)]
+        print(name, *results[name])
+    return results
+
+# problems of results against the baseline rows and the known optima
+# returns a list of (file name, description)
+def compare(results, baseline, known):
+    problems = []
+    for name, (status, size, nodes, run_time, _, _) in sorted(results.items()):
+        if status == "ok" and name in known and int(size) != known[name]:
+            problems.append((name, "wrong answer %s, optimum is %d" % (size, known[name])))
+        base = baseline.get(name)
+        if base is None:
+            continue
+        base_status, base_size, base_nodes = base[0], base[1], base[2]
+        base_time = float(base[3])
+        if base_status != "ok":
+            continue
+        if status != "ok":
+            problems.append((name, status + ", baseline solved it in %.3fs" % base_time))
+            continue
+        if str(size) != base_size:
+            problems.append((name, "answer %s, baseline has %s" % (size, base_size)))
+        if run_time > base_time * SLOWDOWN and run_time - base_time > NOISE:
+            problems.append((name, "slowdown %.3fs, baseline %.3fs" % (run_time, base_time)))
+        if nodes != "-" and base_nodes != "-" and int(nodes) > int(base_nodes) * SLOWDOWN:
+            problems.append((name, "%s nodes, baseline %s" % (nodes, base_nodes)))
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="benchmark a solver against a baseline")
+    parser.add_argument("solver", choices=sorted(SOLVERS))
+    parser.add_argument("tiers", nargs='*',
+                        help="instance tiers by size (" + ", ".join(TIERS) + "), easy by default")
+    parser.add_argument("-r", "--reps", type=int, default=3)
+    parser.add_argument("-t", "--timeout", type=float, default=None, help="seconds per run")
+    parser.add_argument("-o", "--output", default="bench_output.txt")
+    parser.add_argument("-b", "--baseline", default=None,
+                        help="baseline table, bench_<solver>_baseline.txt by default")
+    parser.add_argument("--save", action="store_true",
+                        help="store the results as the new baseline")
+    args = parser.parse_intermixed_args()
+    for t in args.tiers:
+        if t not in TIERS:
+            parser.error("unknown tier " + t)
+
+    by_tier = tiers()
+    names = sorted(name for t in args.tiers or ["easy"] for name in by_tier[t])
+    results = bench(args.solver, names, args.reps, args.timeout)
+    runner.write_results(args.output, HEADER, results)
+
+    baseline_file = args.baseline or ("bench_" + args.solver + "_baseline.txt")
+    baseline = {}
+    if os.path.exists(baseline_file):
+        baseline = c.read_table(baseline_file)
+    problems = compare(results, baseline, reference())
+    for name, problem in problems:
+        print("FLAG", name, problem)
+    if args.save:
+        merged = dict(baseline)
+        merged.update(results)
+        runner.write_results(baseline_file, HEADER, merged)
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,436 @@
+from timeit import default_timer as timer
+
+# components with at most this many vertices are handed to the bitset search
+MAX_VERTICES = 128
+
+# frame kinds
+NODE = 0 # search node branching on M[v] and N(v)
+SPLIT = 1 # disconnected node whose components are solved one after another
+
+# vertices of a bitset, lowest first
+def bits(m):
+    while m:
+        low = m & -m
+        yield low.bit_length() - 1
+        m ^= low
+
+# one open search node on the explicit stack
+# vertex sets are bitsets over the component's local indices; ub is the
+# bound the node's VC has to beat, not counting forced, the vertices the
+# reductions put into the VC when the node was entered
+class Frame:
+    def __init__(self, kind, ub, forced):
+        self.kind = kind
+        self.ub = ub
+        self.forced = forced
+        self.index = 0 # next branch or component to open
+        self.waiting = False # whether a child has been opened
+        self.best = None # best VC below this node
+        self.rest = None # NODE: remaining vertices
+        self.branches = None # NODE: vertex sets taken by each branch
+        self.packs = () # packing constraints holding at the node
+        self.branch_packs = None # NODE: packing constraints added by each branch
+        self.rule = None # NODE: kind of branching, for the telemetry
+        self.ccs = None # SPLIT: components, smallest first
+        self.lbs = None # SPLIT: lower bound of each component
+        self.rest_lb = 0 # SPLIT: lower bounds of the unopened components
+
+# branch-and-bound on one component of the compact graph g with the
+# adjacency held as Python int bitsets, so neighborhood removal, degrees and
+# clique tests are bitwise operations
+# vs are the component's vertices, all of whose alive neighbors are in vs;
+# the search looks for a VC smaller than ub and, like engine.Search, keeps
+# its state on an explicit stack so run can stop and continue
+# packs are packing constraints on the component as (vertices, budget),
+# allowing at most budget of the vertices into the VC; the search keeps them
+# as (bitset, budget) of the undecided vertices, and adds those of
+# engine.Search on each branch, unless packs is None
+# rule names the branching rule as for engine.Search, and profile is an
+# optional instrument.Profile recording the nodes, at depth below the stack
+# depth of the caller, along with packing cuts and branchings
+class Search:
+    def __init__(self, g, vs, ub, packs=(), rule="mirror", profile=None, depth=0):
+        self.vs = list(vs)
+        index = {v: i for i, v in enumerate(self.vs)}
+        self.use_packing = packs is not None
+        self.packs = []
+        for us, budget in packs or ():
+            m = 0
+            for u in us:
+                if u in index:
+                    m |= 1 << index[u]
+            if m.bit_count() > budget:
+                self.packs.append((m, budget))
+        self.nbr = []
+        for v in self.vs:
+            m = 0
+            for u in g.neighbors(v):
+                m |= 1 << index[u]
+            self.nbr.append(m)
+        self.closed = [m | 1 << i for i, m in enumerate(self.nbr)]
+        self.mate = {} # double cover matching of the last lp_bound call
+        self.ub = ub
+        self.rule = rule
+        self.profile = profile
+        self.depth = depth
+        self.stack = []
+        self.ret = None # VC bitset returned by the last node that finished
+        self.started = False
+        self.done = False
+        self.nodes = 0
+
+    # pickled without the profile, see engine.Search.resume
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["profile"] = None
+        return state
+
+    # the VC found as vertices of g, or None if there is none with fewer
+    # than ub vertices
+    @property
+    def result(self):
+        if self.ret is None:
+            return None
+        return [self.vs[i] for i in bits(self.ret)]
+
+    # search until done, until deadline (a timer() value) has passed or
+    # until nodes more nodes have been entered
+    # returns whether the search is done
+    def run(self, deadline=None, nodes=None):
+        if self.done:
+            return True
+        if nodes is not None:
+            nodes += self.nodes
+        stack = self.stack
+        if not self.started:
+            self.started = True
+            self.enter((1 << len(self.vs)) - 1, self.ub, self.packs, 0)
+
+        while stack:
+            if deadline is not None and timer() > deadline:
+                return False
+            if nodes is not None and self.nodes >= nodes:
+                return False
+
+            frame = stack[-1]
+            if frame.kind == NODE:
+                if frame.waiting:
+                    # branch finished
+                    frame.waiting = False
+                    if self.ret is not None:
+                        frame.best = self.ret | frame.branches[frame.index - 1]
+                        frame.ub = frame.best.bit_count()
+                    elif self.profile is not None:
+                        self.profile.count(frame.rule + "_pruned")
+                if frame.index < len(frame.branches):
+                    taken = frame.branches[frame.index]
+                    frame.index += 1
+                    frame.waiting = True
+                    self.enter(frame.rest & ~taken, frame.ub - taken.bit_count(),
+                               frame.packs + frame.branch_packs[frame.index - 1], taken)
+                else:
+                    stack.pop()
+                    self.ret = None if frame.best is None else frame.best | frame.forced
+            else:
+                if frame.waiting:
+                    # component finished
+                    frame.waiting = False
+                    if self.ret is None:
+                        stack.pop()
+                        continue
+                    frame.best |= self.ret
+                if frame.index < len(frame.ccs):
+                    cc = frame.ccs[frame.index]
+                    frame.rest_lb -= frame.lbs[frame.index]
+                    frame.index += 1
+                    frame.waiting = True
+                    self.enter(cc, frame.ub - frame.best.bit_count() - frame.rest_lb,
+                               frame.packs, 0)
+                else:
+                    stack.pop()
+                    self.ret = frame.best | frame.forced
+
+        self.done = True
+        return True
+
+    # degree-zero, degree-one, triangle and domination reductions on the
+    # vertices r until none applies
+    # returns (vertices forced into the VC, vertices left)
+    def reduce(self, r):
+        nbr, closed = self.nbr, self.closed
+        forced = 0
+        changed = True
+        while changed:
+            changed = False
+            left = r
+            while left:
+                low = left & -left
+                left ^= low
+                if not r & low:
+                    continue
+                v = low.bit_length() - 1
+                n = nbr[v] & r
+                d = n.bit_count()
+                if d == 0:
+                    r ^= low
+                    continue
+                if d == 1 or (d == 2 and nbr[n.bit_length() - 1] & n):
+                    # N(v) is a clique, so some optimal VC contains it
+                    forced |= n
+                    r &= ~(n | low)
+                    changed = True
+                    continue
+                # u in N(v) dominates v if N[v] is within N[u], then u is taken
+                dom = n
+                rest = n
+                while rest and dom:
+                    w = rest & -rest
+                    rest ^= w
+                    dom &= closed[w.bit_length() - 1]
+                if dom:
+                    u = dom & -dom
+                    forced |= u
+                    r ^= u
+                    changed = True
+        return (forced, r)
+
+    # charge the vertices taken to the packing constraints packs, and once
+    # a constraint has no budget left leave its other vertices among r out
+    # of the VC by taking their neighbors, which is charged in turn
+    # returns (constraints left, vertices taken, vertices left), or None if
+    # a constraint is exceeded
+    def constrain(self, packs, r, taken):
+        nbr = self.nbr
+        forced = 0
+        while True:
+            left = []
+            excluded = 0
+            for m, budget in packs:
+                budget -= (m & taken).bit_count()
+                if budget < 0:
+                    return None
+                m &= r
+                if budget == 0:
+                    excluded |= m
+                elif m.bit_count() > budget:
+                    left.append((m, budget))
+            taken = 0
+            for u in bits(excluded):
+                taken |= nbr[u]
+            taken &= r
+            if taken & excluded:
+                return None
+            r &= ~(taken | excluded)
+            forced |= taken
+            packs = left
+            if not taken:
+                return (packs, forced, r)
+
+    # connected components of the vertices r
+    def components(self, r):
+        nbr = self.nbr
+        ccs = []
+        while r:
+            seen = frontier = r & -r
+            while frontier:
+                reach = 0
+                for v in bits(frontier):
+                    reach |= nbr[v]
+                frontier = reach & r & ~seen
+                seen |= frontier
+            ccs.append(seen)
+            r &= ~seen
+        return ccs
+
+    # |r| minus the number of cliques in a greedy clique cover of r
+    def clique_bound(self, r):
+        nbr = self.nbr
+        count = 0
+        left = r
+        while left:
+            v = left & -left
+            cand = nbr[v.bit_length() - 1] & left
+            left &= ~v
+            while cand:
+                u = cand & -cand
+                cand &= nbr[u.bit_length() - 1]
+                left &= ~u
+            count += 1
+        return r.bit_count() - count
+
+    # value of the half-integral LP relaxation on the vertices r, half the
+    # size of a maximum matching in the bipartite double cover
+    # the matching of the previous call is repaired, then every free left
+    # vertex looks for an augmenting path by BFS over bitsets
+    def lp_bound(self, r):
+        nbr = self.nbr
+        mate_l = {u: w for u, w in self.mate.items() if r >> u & r >> w & 1}
+        mate_r = {w: u for u, w in mate_l.items()}
+        for root in bits(r):
+            if root in mate_l:
+                continue
+            parent = {}
+            seen = 0
+            frontier = [root]
+            found = None
+            while frontier and found is None:
+                reached = []
+                for x in frontier:
+                    cand = nbr[x] & r & ~seen
+                    seen |= cand
+                    for w in bits(cand):
+                        parent[w] = x
+                        if w not in mate_r:
+                            found = w
+                            break
+                        reached.append(mate_r[w])
+                    if found is not None:
+                        break
+                frontier = reached
+            # flip the path back to root
+            w = found
+            while w is not None:
+                x = parent[w]
+                prev = mate_l.get(x)
+                mate_l[x] = w
+                mate_r[w] = x
+                w = prev
+        self.mate = mate_l
+        return (len(mate_l) + 1) // 2
+
+    # mirrors of v among the vertices r: u at distance 2 from v is a mirror
+    # if N(v) - N(u) is a clique
+    def mirrors(self, v, r):
+        nbr = self.nbr
+        n = nbr[v] & r
+        n2 = 0
+        for w in bits(n):
+            n2 |= nbr[w]
+        n2 &= r & ~(n | 1 << v)
+        mirrors = 1 << v
+        for u in bits(n2):
+            rest = n & ~nbr[u]
+            if all(rest & ~nbr[w] == 1 << w for w in bits(rest)):
+                mirrors |= 1 << u
+        return mirrors
+
+    # enter a search node on the vertices r, needing a VC smaller than ub,
+    # under the packing constraints packs, taken being the vertices the
+    # branch just put into the VC
+    # either settles it at once, leaving the answer in ret, or pushes a frame
+    def enter(self, r, ub, packs, taken):
+        self.nodes += 1
+        self.ret = None
+        prof = self.profile
+        timed = False
+        if prof is not None:
+            timed = prof.node(self.depth + len(self.stack))
+        forced = 0
+        while True:
+            if packs:
+                packed = self.constrain(packs, r, taken)
+                if packed is None:
+                    if prof is not None:
+                        prof.count("cut_packing")
+                    return
+                packs, taken, r = packed
+                forced |= taken
+            taken, r = self.reduce(r)
+            forced |= taken
+            if not (packs and taken):
+                break
+        current = forced.bit_count()
+        if timed:
+            prof.lap("reduce")
+        if r == 0:
+            if current < ub:
+                self.ret = forced
+            return
+        if current + 1 >= ub:
+            return
+        ub -= current
+
+        ccs = self.components(r)
+        if timed:
+            prof.lap("split")
+        if len(ccs) > 1:
+            ccs.sort(key=int.bit_count)
+            lbs = [self.clique_bound(cc) for cc in ccs]
+            if sum(lbs) >= ub:
+                return
+            frame = Frame(SPLIT, ub, forced)
+            frame.best = 0
+            frame.packs = packs
+            frame.ccs = ccs
+            frame.lbs = lbs
+            frame.rest_lb = sum(lbs)
+            self.stack.append(frame)
+            return
+
+        # a VC of k vertices covers at most k * max_deg edges
+        nbr = self.nbr
+        degs = {u: (nbr[u] & r).bit_count() for u in bits(r)}
+        if sum(degs.values()) > 2 * (ub - 1) * max(degs.values()):
+            return
+        cut = self.clique_bound(r) >= ub or self.lp_bound(r) >= ub
+        if timed:
+            prof.lap("bounds")
+        if cut:
+            return
+
+        if prof is not None:
+            start = timer()
+        frame = Frame(NODE, ub, forced)
+        frame.rest = r
+        frame.packs = packs
+        frame.rule, frame.branches, frame.branch_packs = self.branch(r, degs)
+        if prof is not None:
+            prof.count(frame.rule + "_branch")
+            prof.add_time(frame.rule + "_branch", timer() - start)
+            if timed:
+                prof.lap("branch")
+        self.stack.append(frame)
+
+    # the branches of the rule on the vertices r, with degrees degs
+    # returns (kind, branches, packs) as the rules of branching do
+    def branch(self, r, degs):
+        nbr = self.nbr
+        rule = self.rule
+        d = max(degs.values())
+        if rule == "degree3" and d <= 3:
+            for v, dv in degs.items():
+                if dv == 2:
+                    # N(v) is no clique, the reductions take those
+                    u, w = bits(nbr[v] & r)
+                    return ("degree2", [nbr[v] & r, (nbr[u] | nbr[w]) & r], [[], []])
+
+        if rule == "max_degree_edges":
+            def edges(v):
+                n = nbr[v] & r
+                return sum((nbr[u] & n).bit_count() for u in bits(n))
+            v = min((u for u in degs if degs[u] == d), key=edges)
+        else:
+            v = max(degs, key=degs.get)
+        n = nbr[v] & r
+        first, second = 1 << v, n
+        kind = rule
+        if rule in ("mirror", "satellite", "degree3"):
+            first = self.mirrors(v, r)
+            kind = "mirror"
+            if first == 1 << v and rule != "mirror":
+                # the branch leaving v out leaves out its satellites too
+                kind = "satellite"
+                for w in bits(n):
+                    outer = nbr[w] & r & ~n & ~first
+                    if outer.bit_count() == 1:
+                        second |= nbr[outer.bit_length() - 1] & r
+
+        packs = [[], []]
+        if self.use_packing:
+            packs[0].append((n, d - 1))
+            if first == 1 << v:
+                for u in bits(n):
+                    m = nbr[u] & r & ~n & ~first
+                    if m:
+                        packs[1].append((m, m.bit_count() - 1))
+        return (kind, [first, second], packs)
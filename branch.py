@@ -1,235 +1,243 @@
 import os
-import sys
-import operator
+import multiprocessing as mp
 from timeit import default_timer as timer
-import networkx as nx
-import networkx.algorithms.approximation as naa
+import checkpoint
 import common as c
-
-sys.setrecursionlimit(2000)
+import clique
+import dispatch
+import engine
+import instrument
+import kernel
+import ilp_model
+import local_search
+import lower_bounds
+import solution_cache
+import transposition
+import tree_dp
 
 script_dir = os.path.dirname(__file__)
 input_dir = os.path.join(script_dir, "vc-exact-public")
 
+# seconds of local search before branching starts at most
+LS_TIME = 1
+# the first local search also stops after this many steps per kernel vertex
+# without a smaller VC, so that easy kernels go on to branching at once
+LS_STALL = 50
+# seconds of branching and of local search in each round after that
+BRANCH_SLICE = 5
+LS_SLICE = 0.5
+
 # wrapper function to keep track of best VC found during bnb
-def solve(g):
-    slv = set()
+# g is the array-backed graph built by c.parse_graph(f, compact=True)
+# profile is an optional instrument.Profile collecting reduction counts,
+# cuts, node counts, depths and sampled timings of the run
+# bounds lists the lower bound providers tried at every node
+# timeout is in seconds, None lets the search run until it finishes
+# on timeout a ValueError carries the size of the best VC found and the VC
+# solutions is an optional SolutionCache: optimal cached covers are returned
+# as they are, other cached covers bound the search, and the VC found is
+# stored back
+# method is "bnb" to branch on the kernel, "ilp" to hand it to ilp_model,
+# "clique" to search a maximum clique of its complement with clique, or
+# "auto" to let dispatch pick a method for each of its components
+# rule names the branching rule of "bnb" in branching.RULES
+# checkpoint_path is an optional file the search of "bnb" is saved to every
+# checkpoint.INTERVAL seconds and on timeout, and resumed from if it holds
+# a search of the same instance
+def solve(g, profile=None, bounds=lower_bounds.PROVIDERS, timeout=2 * 60, solutions=None,
+          method="bnb", rule="satellite", checkpoint_path=None):
+    if solutions is None:
+        return solve_graph(g, profile, bounds, timeout, method=method, rule=rule,
+                           checkpoint_path=checkpoint_path)
+
+    start = timer()
+    edges = solution_cache.graph_edges(g)
+    key = solution_cache.fingerprint(g.n, edges)
+    entry = solutions.lookup(key, g.n, edges)
+    if entry is not None and entry["optimal"]:
+        return set(entry["cover"])
+    warm_start = None if entry is None else entry["cover"]
+    try:
+        vc = solve_graph(g, profile, bounds, timeout, warm_start, method, rule, checkpoint_path)
+    except ValueError as err:
+        solutions.put(key, g.n, edges, err.args[1], method, timer() - start, optimal=False)
+        raise
+    solutions.put(key, g.n, edges, vc, method, timer() - start)
+    return vc
+
+# solve without a solution cache
+# warm_start is an optional known VC of g, the search only looks for
+# smaller ones
+def solve_graph(g, profile=None, bounds=lower_bounds.PROVIDERS, timeout=2 * 60,
+                warm_start=None, method="bnb", rule="satellite", checkpoint_path=None):
+    deadline = None
+    if timeout is not None:
+        deadline = timer() + timeout
+
+    # continue from a checkpoint of the same instance
+    key = None
+    if checkpoint_path is not None and method == "bnb":
+        key = solution_cache.fingerprint(g.n, solution_cache.graph_edges(g))
+        state = checkpoint.load(checkpoint_path)
+        if state is not None and state["key"] == key:
+            s = state["search"]
+            s.resume(profile, mp.Value('i', s.best_sol))
+            return run_search(state, deadline, warm_start, checkpoint_path)
 
     # include vertices with self-loops in any VC
-    for e in nx.selfloop_edges(g):
-        v, _ = e
-        slv.add(v)
-
     # self-loop vertices can be removed from the graph
-    for v in slv:
-        g.remove_node(v)
-
-    # run degree-one reduction once if relevant
-    # this call of the reduction removes vertices to handle large trees quickly
-    for _, d in g.degree():
-        if d == 1:
-            tree_vc = c.deg_one_redux(g, in_place=False)
-            slv = slv.union(tree_vc)
-
-            if g.size() == 0:
-                return slv
-
-            break
-
-    # get 2-approx estimate for VC
-    approx_vc = naa.min_weighted_vertex_cover(g)
-    approx_ub = len(approx_vc)
-
-    # start timer for branching
-    init = timer()
-    TIMEOUT = 2 * 60
-
-    # track size of best solution encountered
-    best_sol = len(g)
-
-    def bnb(g, current=0, ub=-1, layer=0, is_split=False):
-        nonlocal best_sol
-
-        # check if branching has timed out
-        # if it has, error out with size of best solution encountered
-        if timer() - init > TIMEOUT:
-            raise ValueError(best_sol + len(slv))
-
-        # check if graph is empty or a single vertex
-        n = len(g)
-        if n <= 1:
-            return set()
-
-        # check if graph is a single edge
-        if n == 2 and g.size() == 1:
-            return set([list(g)[0]])
-
-        vc = set()
-
-        # apply degree-one reduction if relevant
-        has_deg_one_redux = False
-        for _, d in g.degree():
-            if d == 1:
-                has_deg_one_redux = True
-                tree_vc, cover = c.deg_one_redux(g)
-                vc = vc.union(tree_vc)
-                current += len(tree_vc)
-
-                if g.size() == 0:
-                    for e in cover:
-                        g.add_edge(*e)
-                    if not is_split and len(vc) < best_sol:
-                        best_sol = len(vc)
-                    return vc
-
-                break
-
-        # get relevant instance info
-        deg_list = sorted([(v, d) for v, d in g.degree()],
-                          key=operator.itemgetter(1), reverse=True)
-        v, max_deg = deg_list[0]
-
-        # simple bound check
-        if ub > 0 and current >= ub:
-            # add all vertices to the VC, effectively terminating the branch
-            for v in g:
-                vc.add(v)
-
-            if has_deg_one_redux:
-                for e in cover:
-                    g.add_edge(*e)
-
-            return vc
-
-        # split instance into connected components if relevant
-        if not nx.is_connected(g):
-            # ccs = [(g.subgraph(cc).copy(), ag.subgraph(cc).copy())
-            #        for cc in nx.connected_components(g)]
-
-            ccs = [[v for v in g.subgraph(cc)] for cc in nx.connected_components(g)]
-
-            # for (cc, acc) in ccs:
-            #     vc = vc.union(bnb(cc, acc, current=current, ub=ub, is_split=True))
-
-            for cc in ccs:
-                if len(cc) > 1:
-                    excluded_vertices = list(set([v for v in g]) - set(cc))
-                    excluded_edges = []
-                    for v in excluded_vertices:
-                        v_edges = [e for e in g.edges(v)]
-                        excluded_edges += v_edges
-                        g.remove_node(v)
-
-                    cc_vc = bnb(g, current=current, ub=-1, layer=layer, is_split=True)
-                    vc = vc.union(cc_vc)
-                    current += len(cc_vc)
-
-                    for v in excluded_vertices:
-                        g.add_node(v)
-                    for e in excluded_edges:
-                        g.add_edge(*e)
-
-            if has_deg_one_redux:
-                for e in cover:
-                    g.add_edge(*e)
-
-            if not is_split and len(vc) < best_sol:
-                best_sol = len(vc)
-
-            return vc
-
-        # bound check from Lemma 2.3 of Cygan et al.
-        if max_deg <= ub and (len(g) > (ub**2 + ub) or g.size() > ub**2):
-            # add all vertices to the VC, effectively terminating the branch
-            for v in g:
-                vc.add(v)
-
-            if has_deg_one_redux:
-                for e in cover:
-                    g.add_edge(*e)
-
-            return vc
-
-        # find mirrors of v
-        neighbors = [u for u in g[v]]
-        second_neighbors = c.neighborhood(g, v, 2)
-        mirrors = [v] # always include v itself for branching
-        for u in second_neighbors:
-            neighbor_diff = list(set(neighbors) - set([w for w in g[u]]))
-            s = len(neighbor_diff)
-            if s == 0:
-                mirrors.append(u)
-            else:
-                max_edges = (s * (s + 1)) / 2
-                if g.subgraph(neighbor_diff).size() == max_edges:
-                    mirrors.append(u)
-
-        # if no mirrors, find satellites of v
-        satellites = set([v])
-        if len(mirrors) == 1:
-            for w in neighbors:
-                neighbor_diff = list(set([u for u in g[w]]) - set(neighbors + [v]))
-                if len(neighbor_diff) == 1:
-                    satellites.add(neighbor_diff[0])
-
-        # branch 1: M[v] in VC
-        in_cover = []
-        in_vc = set(mirrors)
-        in_current = current + len(in_vc)
-        for u in mirrors:
-            in_subcover = [e for e in g.edges(u)]
-            for e in in_subcover:
-                in_cover.append(e)
-                g.remove_edge(*e)
-        in_result = bnb(g, current=in_current, ub=ub, layer=layer+1, is_split=is_split)
-        in_current += len(in_result)
-        in_vc = in_vc.union(in_result)
-        if ub < 0 or in_current < ub:
-            ub = in_current
-        for e in in_cover:
-            g.add_edge(*e)
-        if not is_split and len(vc.union(in_vc)) < best_sol:
-            best_sol = len(vc.union(in_vc))
-
-        # branch 2: N(S[v]) in VC
-        out_cover = []
-        out_vc = set()
-        out_current = current
-        satellite_neighbors = set()
-        for u in satellites:
-            for w in g[u]:
-                satellite_neighbors.add(w)
-        for w in satellite_neighbors:
-            out_subcover = [e for e in g.edges(w)]
-            for e in out_subcover:
-                out_cover.append(e)
-                g.remove_edge(*e)
-            out_vc.add(w)
-            out_current += 1
-        out_result = bnb(g, current=out_current, ub=ub, layer=layer+1, is_split=is_split)
-        out_current += len(out_result)
-        out_vc = out_vc.union(out_result)
-        for e in out_cover:
-            g.add_edge(*e)
-        # if not is_split and len(vc.union(out_vc)) < best_sol:
-        #     best_sol = len(vc.union(out_vc))
-
-        if has_deg_one_redux:
-            for e in cover:
-                g.add_edge(*e)
-
-        if in_current < out_current:
-            return vc.union(in_vc)
+    for v in g.loops:
+        if g.alive[v]:
+            g.take(v)
+    slv = set(g.cover())
+
+    # reduce the instance to a kernel and branch on the kernel only
+    start = timer()
+    k = kernel.Kernel(g.adjacency(), g.n + 1).reduce()
+    if profile is not None:
+        profile.counts.update(k.counts)
+        profile.add_time("kernel", timer() - start)
+    g, labels = k.graph()
+    if g.size == 0:
+        return slv.union(k.unfold([]))
+
+    # VC vertices already fixed outside the kernel
+    offset = len(slv) + k.offset
+
+    # kernels of small treewidth are solved exactly by the DP before
+    # branching; the other methods are left to the kernel, with dispatch
+    # routing components to the DP itself
+    if method == "bnb" and g.size <= dispatch.TW_MAX_EDGES:
+        start = timer()
+        vc = tree_dp.solve(g, deadline=deadline)
+        if profile is not None:
+            profile.add_time("tree_dp", timer() - start)
+        if vc is not None:
+            return slv.union(k.unfold(labels[v] for v in vc))
+
+    # local search gives the first upper bound, and keeps improving it in
+    # between rounds of branching
+    lb = lower_bounds.LPBound()(g)
+    start = timer()
+    ls = first_cover(g, lb, deadline)
+    if profile is not None:
+        profile.add_time("local_search", timer() - start)
+    if len(ls.best) <= lb:
+        return slv.union(k.unfold(labels[v] for v in ls.best))
+    if method != "bnb":
+        time_limit = None
+        if deadline is not None:
+            time_limit = max(deadline - timer(), 1)
+        if method == "ilp":
+            vc, optimal = ilp_model.solve(g, ls.best, time_limit)
+        elif method == "clique":
+            vc, optimal = clique.solve(g, ls.best, time_limit)
         else:
-            vc = vc.union(out_vc)
-            if not is_split and len(vc) < best_sol:
-                best_sol = len(vc)
-            return vc
-
-    return slv.union(bnb(g, ub=approx_ub))
+            vc, optimal = dispatch.solve(g, ls.best, time_limit, profile, bounds)
+        vc = slv.union(k.unfold(labels[v] for v in vc))
+        if warm_start is not None and len(warm_start) < len(vc):
+            vc = set(warm_start)
+        if not optimal:
+            raise ValueError(len(vc), vc)
+        return vc
+
+    ub = len(ls.best)
+    if warm_start is not None:
+        ub = min(ub, len(warm_start) - offset)
+    incumbent = mp.Value('i', offset + ub)
+    table = transposition.TranspositionTable()
+    s = engine.Search(g, ub, offset, profile, bounds, incumbent, table, rule=rule)
+    state = {"key": key, "slv": slv, "kernel": k, "labels": labels, "local_search": ls,
+             "search": s}
+    return run_search(state, deadline, warm_start, checkpoint_path)
+
+# local search on the compact graph g from its 2-approx VC, which stops
+# once it meets the lower bound lb, once it has gone LS_STALL steps per
+# vertex without a smaller VC, or after LS_TIME seconds or at deadline
+# returns the NuMVC, whose best VC is the first upper bound of a search
+def first_cover(g, lb, deadline=None):
+    ls = local_search.NuMVC(g, g.matching_cover())
+    ls_deadline = timer() + LS_TIME
+    if deadline is not None:
+        ls_deadline = min(ls_deadline, deadline)
+    improved = True
+    while improved and len(ls.best) > lb:
+        improved = False
+        for _ in ls.covers(ls_deadline, LS_STALL * len(g)):
+            improved = True
+            break
+    return ls
+
+# run the search of state, alternating with the local search, until it is
+# done or deadline has passed
+# state holds everything a checkpoint needs to continue: the fingerprint
+# of the instance, the self-loop vertices slv, the Kernel with its reduction
+# log, the labels of the kernel graph, the local search and the
+# engine.Search with its open frames, trail and best VC
+# with checkpoint_path, state is saved there every checkpoint.INTERVAL
+# seconds and on timeout, and removed once the search is done
+def run_search(state, deadline, warm_start, checkpoint_path):
+    slv, k, labels, ls, s = (state[name] for name in
+                             ["slv", "kernel", "labels", "local_search", "search"])
+    offset = s.offset
+    incumbent = s.incumbent
+
+    def best():
+        # only a finished search has a VC of the whole kernel in result
+        vcs = [ls.best, s.best_cover]
+        if s.done:
+            vcs.append(s.result)
+        vc = min((vc for vc in vcs if vc is not None), key=len)
+        vc = slv.union(k.unfold(labels[v] for v in vc))
+        if warm_start is not None and len(warm_start) < len(vc):
+            vc = set(warm_start)
+        return vc
+
+    next_save = timer() + checkpoint.INTERVAL
+    while not s.run(timer() + BRANCH_SLICE if deadline is None
+                    else min(deadline, timer() + BRANCH_SLICE)):
+        if deadline is not None and timer() > deadline:
+            if checkpoint_path is not None:
+                checkpoint.save(checkpoint_path, state)
+            vc = best()
+            raise ValueError(len(vc), vc)
+        ls.run(LS_SLICE)
+        with incumbent.get_lock():
+            incumbent.value = min(incumbent.value, offset + len(ls.best))
+        if checkpoint_path is not None and timer() >= next_save:
+            checkpoint.save(checkpoint_path, state)
+            next_save = timer() + checkpoint.INTERVAL
+
+    if checkpoint_path is not None:
+        checkpoint.remove(checkpoint_path)
+    return best()
+
+# branch-and-bound on the compact graph g
+# returns a minimum VC of the remaining graph if it has fewer than ub
+# vertices, otherwise None
+# offset counts VC vertices fixed outside g, so that the best total VC size
+# seen so far can be reported on timeout
+# incumbent is an optional shared multiprocessing Value with the best total
+# VC size known to any process, read and improved at every node
+# table is an optional TranspositionTable remembering solved components
+# rule names the branching rule in branching.RULES
+# on timeout a ValueError carries the size of the best VC found and the VC,
+# which is None if the search found none below ub
+def search(g, ub, offset=0, profile=None, bounds=lower_bounds.PROVIDERS, timeout=2 * 60,
+           incumbent=None, table=None, rule="satellite"):
+    s = engine.Search(g, ub, offset, profile, bounds, incumbent, table, rule=rule)
+
+    # if branching times out, error out with the best solution encountered
+    deadline = None
+    if timeout is not None:
+        deadline = timer() + timeout
+    if not s.run(deadline):
+        raise ValueError(s.best_sol, s.best_cover)
+    return s.result
 
 
 if __name__ == "__main__":
+    solutions = solution_cache.SolutionCache()
     with open("bnb_output.txt", 'w') as output:
         output.write("file_name vc_size run_time\n")
         with os.scandir(input_dir) as dir:
@@ -237,16 +245,14 @@ if __name__ == "__main__":
     # file = os.path.join(input_dir, "vc-exact_047.hgr")
                 with open(file, encoding="latin-1") as f:
                     start = timer()
-                    g = c.parse_graph(f)
+                    g = c.parse_graph(f, compact=True)
+                    profile = instrument.Profile()
                     try:
-                        vc = solve(g)
+                        vc = solve(g, profile, solutions=solutions)
                         sol_found = True
                     except ValueError as err:
                         sol_found = False
                         vc = err.args[0]
-                    except RuntimeError:
-                        sol_found = False
-                        vc = -1
                     end = timer()
 
                     if sol_found:
@@ -258,3 +264,4 @@ if __name__ == "__main__":
                     output.write(data + '\n')
                     print(str(file.name) + " done")
                     print(sol, run_time)
+                    print(' '.join(r + '=' + str(n) for r, n in profile.counts.items()))
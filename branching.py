@@ -0,0 +1,98 @@
+import common as c
+
+# branching rules of engine.Search, selected by name per run
+# a rule is called on the remaining graph of a search node, after the
+# reductions and bounds, and returns (kind, branches, packs): kind names the
+# case that applied, for the telemetry, branches the vertex sets taken by
+# each branch, and packs the packing constraints each branch may keep
+# bitset.Search follows the same rules on its bitsets
+
+# branch on v of maximum degree: v in VC, or N(v) in VC
+class MaxDegree:
+    name = "max_degree"
+
+    def __call__(self, g):
+        v = self.vertex(g)
+        neighbors = g.neighbors(v)
+        return (self.name, [[v], neighbors], packs(g, v, neighbors, True))
+
+    def vertex(self, g):
+        return g.max_degree_vertex()
+
+# max degree, ties broken by the fewest edges within N(v), so that taking
+# N(v) removes the most edges
+class MaxDegreeEdges(MaxDegree):
+    name = "max_degree_edges"
+
+    def vertex(self, g):
+        d = g.deg[g.max_degree_vertex()]
+        best, fewest = None, None
+        for v in g.bucket(d):
+            neighbors = set(g.neighbors(v))
+            edges = sum(1 for u in neighbors for w in g.neighbors(u) if w in neighbors)
+            if best is None or edges < fewest:
+                best, fewest = v, edges
+        return best
+
+# max degree, the branch taking v takes its mirrors M(v) as well
+class Mirror(MaxDegree):
+    name = "mirror"
+
+    def __call__(self, g):
+        v = self.vertex(g)
+        mirrors, _ = c.mirrors_satellites(g, v)
+        neighbors = g.neighbors(v)
+        return (self.name, [mirrors, neighbors], packs(g, v, neighbors, len(mirrors) == 1))
+
+# mirrors if v has any, otherwise the branch taking N(v) leaves out the
+# satellites of v as well and takes N(S[v])
+class Satellite(MaxDegree):
+    name = "satellite"
+
+    def __call__(self, g):
+        v = self.vertex(g)
+        mirrors, satellites = c.mirrors_satellites(g, v)
+        if len(mirrors) > 1:
+            satellites = [v]
+        satellite_neighbors = set()
+        for u in satellites:
+            satellite_neighbors.update(g.neighbors(u))
+        kind = "mirror" if len(mirrors) > 1 else "satellite"
+        return (kind, [mirrors, list(satellite_neighbors)],
+                packs(g, v, g.neighbors(v), len(mirrors) == 1))
+
+# satellite branching, except that on graphs of maximum degree 3 a vertex v
+# of degree 2 with neighbors u and w is branched on as u and w in VC, or
+# N(u) and N(w) in VC: a VC with v and one of u, w swaps v for the other
+# if u and w are adjacent N(v) is a clique and in some minimum VC
+class Degree3(Satellite):
+    name = "degree3"
+
+    def __call__(self, g):
+        if g.deg[g.max_degree_vertex()] <= 3 and g.head[2] >= 0:
+            u, w = g.neighbors(g.head[2])
+            if w in g.neighbors(u):
+                return ("degree2", [[u, w]], [[]])
+            outer = set(g.neighbors(u))
+            outer.update(g.neighbors(w))
+            return ("degree2", [[u, w], list(outer)], [[], []])
+        return super().__call__(g)
+
+# packing constraints of the branches v in VC and N(v) in VC: the first may
+# not take all of N(v) as well, and if v has no mirrors the second may not
+# take all of N(u) - N[v] for any u in N(v)
+def packs(g, v, neighbors, no_mirrors):
+    second = []
+    if no_mirrors:
+        closed = set(neighbors)
+        closed.add(v)
+        for u in neighbors:
+            vs = [w for w in g.neighbors(u) if w not in closed]
+            if vs:
+                second.append(vs)
+    return [[neighbors], second]
+
+RULES = {rule.name: rule for rule in [MaxDegree, MaxDegreeEdges, Mirror, Satellite, Degree3]}
+
+# kinds of branching the rules report
+KINDS = ["max_degree", "max_degree_edges", "mirror", "satellite", "degree2"]
@@ -0,0 +1,38 @@
+import os
+import pickle
+import tempfile
+
+script_dir = os.path.dirname(__file__)
+checkpoint_dir = os.path.join(script_dir, "checkpoints")
+
+# seconds between checkpoints of a running search
+INTERVAL = 60
+
+# checkpoint file of an instance, by its file name
+def path(name, dir=checkpoint_dir):
+    return os.path.join(dir, os.path.splitext(os.path.basename(name))[0] + ".pkl")
+
+# pickle state to path, writing a temporary file and moving it into place
+# so that a run killed while saving keeps its previous checkpoint
+def save(path, state):
+    dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dir, prefix=".checkpoint-")
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            pickle.dump(state, out, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+# the state saved at path, or None if there is none
+def load(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def remove(path):
+    if os.path.exists(path):
+        os.remove(path)
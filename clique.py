@@ -0,0 +1,127 @@
+from timeit import default_timer as timer
+
+# the deadline is checked every this many search nodes
+CHECK_NODES = 256
+
+# greedy coloring of the vertices p of the bitset graph adj, each color
+# class taking the lowest-numbered vertices that are pairwise non-adjacent
+# only colors above kmin can lead to a better clique, so a vertex colored
+# above it is moved into a class at or below kmin if it has a single
+# neighbor w there that can move to another class at or below kmin, the
+# Re-NUMBER step of Tomita's MCS
+# returns the vertices colored above kmin and their colors, in increasing
+# color order
+def color_sort(adj, p, kmin):
+    classes = []
+    while p:
+        q = p
+        color = 0
+        while q:
+            low = q & -q
+            p ^= low
+            color |= low
+            q &= ~adj[low.bit_length() - 1] & ~low
+        classes.append(color)
+
+    vs = []
+    colors = []
+    for k in range(max(kmin, 0), len(classes)):
+        q = classes[k]
+        while q:
+            low = q & -q
+            q ^= low
+            v = low.bit_length() - 1
+            if k >= kmin > 1 and renumber(adj, classes, v, low, kmin):
+                continue
+            vs.append(v)
+            colors.append(k + 1)
+    return (vs, colors)
+
+# move v, the bitset low, into one of the first kmin classes if that only
+# needs a single neighbor of v moved between them, or none after earlier moves
+def renumber(adj, classes, v, low, kmin):
+    for k1 in range(kmin):
+        conflicts = classes[k1] & adj[v]
+        if not conflicts:
+            classes[k1] |= low
+            return True
+        if conflicts & (conflicts - 1):
+            continue
+        w = conflicts.bit_length() - 1
+        for k2 in range(k1 + 1, kmin):
+            if not classes[k2] & adj[w]:
+                classes[k1] ^= conflicts | low
+                classes[k2] |= conflicts
+                return True
+    return False
+
+# maximum clique of the bitset graph adj among the vertices p by the
+# branch-and-bound of Tomita et al. with greedy coloring bounds: a branch
+# is cut once the clique plus the colors of its candidates cannot beat the
+# best clique, and the candidates are tried from the highest color down
+# best is a known clique to beat, deadline a timer() value
+# returns (clique, whether it is proven maximum)
+def max_clique(adj, p, best=None, deadline=None):
+    best = list(best or [])
+    clique = []
+    # open nodes as [candidates, vertices, colors, next position]
+    vs, colors = color_sort(adj, p, len(best))
+    stack = [[p, vs, colors, len(vs) - 1]]
+    nodes = 0
+    while stack:
+        nodes += 1
+        if deadline is not None and nodes % CHECK_NODES == 0 and timer() > deadline:
+            return (best, False)
+        frame = stack[-1]
+        p, vs, colors, i = frame
+        if i < 0 or len(clique) + colors[i] <= len(best):
+            stack.pop()
+            if clique:
+                clique.pop()
+            continue
+        v = vs[i]
+        frame[0] = p & ~(1 << v)
+        frame[3] = i - 1
+        clique.append(v)
+        p &= adj[v]
+        if not p:
+            if len(clique) > len(best):
+                best = clique[:]
+            clique.pop()
+            continue
+        vs, colors = color_sort(adj, p, len(best) - len(clique))
+        stack.append([p, vs, colors, len(vs) - 1])
+    return (best, True)
+
+# minimum VC of the compact graph g as the complement of a maximum
+# independent set, found as a maximum clique of the complement graph
+# independent sets of the components of g are found separately, since
+# the complement joins every two components completely
+# vertices are numbered by decreasing degree in the complement, so the
+# coloring starts from the vertices with the most candidates
+# incumbent is an optional VC of g whose complement starts the search, and
+# time_limit in seconds stops it early
+# returns the best VC found and whether it is proven minimum
+def solve(g, incumbent=None, time_limit=None):
+    deadline = None if time_limit is None else timer() + time_limit
+    vs = sorted(g.vertices(), key=lambda v: g.deg[v])
+    index = {v: i for i, v in enumerate(vs)}
+    in_vc = set(vs if incumbent is None else incumbent)
+    independent = []
+    optimal = True
+    for cc in g.components():
+        p = 0
+        for v in cc:
+            p |= 1 << index[v]
+        adj = {}
+        for v in cc:
+            m = 0
+            for u in g.neighbors(v):
+                m |= 1 << index[u]
+            adj[index[v]] = p & ~m & ~(1 << index[v])
+        start = [index[v] for v in cc if v not in in_vc]
+        found, cc_optimal = max_clique(adj, p, start, deadline)
+        independent += found
+        optimal = optimal and cc_optimal
+    independent = set(vs[i] for i in independent)
+    return ([v for v in vs if v not in independent], optimal)
@@ -1,67 +1,153 @@
 import os
+import io
+import re
+import mmap
+import zlib
+import tempfile
+import numpy as np
 import networkx as nx
+from graph import Graph
 
 script_dir = os.path.dirname(__file__)
 input_dir = os.path.join(script_dir, "vc-exact-public")
+cache_dir = os.path.join(script_dir, "cache")
 
-def parse_graph(file):
+# whether load_edges caches parsed instances in cache_dir by default
+use_cache = False
+
+# comment and problem lines of an .hgr file
+skip_lines = re.compile(rb"^[cp][^\n]*\n?", re.M)
+problem_line = re.compile(rb"^p\s+\S+\s+(\d+)", re.M)
+
+# contents of file as a buffer, memory-mapped if file is a real file
+def file_buffer(file):
+    try:
+        fd = file.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        data = file.read()
+        return data.encode() if isinstance(data, str) else data
+    if os.fstat(fd).st_size == 0:
+        return b""
+    return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+
+# cached edge array of the instance with checksum crc, or None
+# the first row of a cache file holds the vertex count and the checksum
+def load_cache(path, crc):
+    try:
+        a = np.load(path)
+    except (OSError, ValueError):
+        return None
+    if a.ndim != 2 or a.shape[0] == 0 or a.shape[1] != 2 or a[0, 1] != crc:
+        return None
+    return (int(a[0, 0]), a[1:])
+
+def save_cache(path, n, edges, crc):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    a = np.empty((len(edges) + 1, 2), dtype=np.int64)
+    a[0] = (n, crc)
+    a[1:] = edges
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".cache-")
+    with os.fdopen(fd, 'wb') as out:
+        np.save(out, a)
+    os.replace(tmp, path)
+
+# parse an .hgr file in bulk
+# returns the number of vertices and an m x 2 int64 array of edges
+# with cache=True the edges are also saved to cache_dir and loaded from
+# there by later calls while the file's checksum stays the same
+def load_edges(file, cache=None):
+    if cache is None:
+        cache = use_cache
+    data = file_buffer(file)
+    try:
+        path = None
+        if cache and isinstance(getattr(file, "name", None), str):
+            path = os.path.join(cache_dir, os.path.basename(file.name) + ".npy")
+            crc = zlib.crc32(data)
+            cached = load_cache(path, crc)
+            if cached is not None:
+                return cached
+
+        m = problem_line.search(data)
+        n = int(m.group(1)) if m else 0
+        edges = np.array(skip_lines.sub(b"", data).split(), dtype=np.int64)
+        edges = edges.reshape(-1, 2)
+        if path is not None:
+            save_cache(path, n, edges, crc)
+        return (n, edges)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+# compact=True builds the array-backed graph used by the branch-and-bound
+def parse_graph(file, compact=False, cache=None):
+    return build_graph(*load_edges(file, cache), compact)
+
+# graph on vertices 1..v with the edges of an array from load_edges
+def build_graph(v, edges, compact=False):
+    if compact:
+        return Graph(v, edges.tolist())
     g = nx.Graph()
-    for line in file:
-        if line[0] == 'p':
-            s = line.split()
-            v = int(s[2])
-            g.add_nodes_from(range(1, v + 1))
-        elif line[0] != 'c':
-            e = line.split()
-            g.add_edge(int(e[0]), int(e[1]))
+    g.add_nodes_from(range(1, v + 1))
+    g.add_edges_from(edges.tolist())
     return g
 
-def has_self_loop(file):
-    for line in file:
-        if line[0] != 'p' and line[0] != 'c':
-            e = line.split()
-            if int(e[0]) == int(e[1]):
-                return True
-    return False
-
-# return nth neighborhood of a vertex
-# taken from https://stackoverflow.com/questions/22742754/finding-the-n-degree-neighborhood-of-a-node
-def neighborhood(g, v, n):
-    path_lengths = nx.shortest_path_length(g, source=v)
-    return [u for u, l in path_lengths.items() if l == n]
-
-# simple degree 1 reduction
-# also solves trees
-def deg_one_redux(g, in_place=True):
-    # g = g.copy()
-    vc = set()
-    keep_going = True
-    cover = []
-    while keep_going:
-        keep_going = False
-        for v, d in g.degree():
-            if d == 1:
-                u = [u for u in g[v]][0]
-                vc.add(u)
-                if in_place:
-                    subcover = [e for e in g.edges(u)]
-                    for e in subcover:
-                        cover.append(e)
-                        g.remove_edge(*e)
+def has_self_loop(file, cache=None):
+    _, edges = load_edges(file, cache)
+    return bool((edges[:, 0] == edges[:, 1]).any())
+
+# rows of a space-separated result table such as the *_output.txt files,
+# by file name
+# old tables name some rows "<DirEntry 'vc-exact_007.hgr'>", which is
+# read as the plain file name
+def read_table(path):
+    rows = {}
+    with open(path) as f:
+        next(f, None)
+        for line in f:
+            s = line.split()
+            if not s:
+                continue
+            if s[0] == "<DirEntry":
+                s = [s[1].strip("'>")] + s[2:]
+            rows[s[0]] = s[1:]
+    return rows
+
+# mirrors and satellites of v in an array-backed graph
+# u in N2(v) is a mirror if N(v) - N(u) is a clique, and u is a satellite if
+# N[w] - N[v] == {u} for some w in N(v)
+# N2(v) is found through N(v) only, and the clique tests look up neighbor
+# sets restricted to N(v), so the work stays within distance 2 of v
+def mirrors_satellites(g, v):
+    neighbors = g.neighbors(v)
+    neighbor_set = set(neighbors)
+
+    # for each vertex at distance 2, the neighbors of v it is adjacent to
+    common = {}
+    inner = {}
+    satellites = [v]
+    for w in neighbors:
+        outer = []
+        inner[w] = set()
+        for u in g.neighbors(w):
+            if u in neighbor_set:
+                inner[w].add(u)
+            elif u != v:
+                outer.append(u)
+                if u in common:
+                    common[u].append(w)
                 else:
-                    leaves = []
-                    for w in g[u]:
-                        if g.degree[w] == 1:
-                            leaves.append(w)
-                    g.remove_node(u)
-                    for w in leaves:
-                        g.remove_node(w)
-                keep_going = True
-                break
-    if in_place:
-        return (vc, cover)
-    else:
-        return vc
+                    common[u] = [w]
+        if len(outer) == 1:
+            satellites.append(outer[0])
+
+    mirrors = [v] # always include v itself for branching
+    for u, ws in common.items():
+        neighbor_diff = neighbor_set.difference(ws)
+        s = len(neighbor_diff) - 1
+        if all(len(inner[w] & neighbor_diff) == s for w in neighbor_diff):
+            mirrors.append(u)
+    return (mirrors, satellites)
 
 if __name__ == "__main__":
     with os.scandir(input_dir) as dir:
@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import argparse
+from timeit import default_timer as timer
+import networkx as nx
+import networkx.algorithms.approximation as naa
+import common as c
+import clique
+import engine
+import ilp_model
+import kernel
+import lower_bounds
+import transposition
+import tree_dp
+
+script_dir = os.path.dirname(__file__)
+input_dir = os.path.join(script_dir, "vc-exact-public")
+model_file = os.path.join(script_dir, "dispatch_model.json")
+
+# the min-degree treewidth heuristic is only run on components with at most
+# this many edges, it is too slow on the dense kernels
+TW_MAX_EDGES = 5000
+
+# default routing: tree decomposition DP for components of small treewidth,
+# the complement max-clique search for dense ones, branch-and-bound for
+# small components or small gaps between the local search cover and the LP
+# bound, ILP otherwise
+# the clique search wins on the vc-exact_047 kernel at density 0.18 and on
+# random graphs from about 0.08 on, but loses on the public kernels at 0.05
+# and below, and does no better than the other methods on the large kernels
+# of 169-173 at 0.11-0.12
+# CBC overruns its time limit and then crashes on the kernels of 80000 edges
+# and more, so components above ilp_max_edges stay with branch-and-bound
+THRESHOLDS = {
+    "td_max_width": tree_dp.MAX_WIDTH,
+    "clique_min_density": 0.15,
+    "bnb_max_vertices": 60,
+    "bnb_max_gap": 2,
+    "ilp_max_edges": 50000,
+}
+
+# features of the component of the compact graph g that is left alive
+# cover is a VC of the component, e.g. from local search
+def features(g, cover):
+    n = len(g)
+    degs = [g.deg[v] for v in g.vertices()]
+    f = {
+        "num_vertices": n,
+        "num_edges": g.size,
+        "min_deg": min(degs),
+        "max_deg": max(degs),
+        "density": 2 * g.size / (n * (n - 1)) if n > 1 else 0,
+        "approx_vc": len(cover),
+        "lp_bound": lower_bounds.LPBound()(g),
+        "treewidth": None,
+    }
+    f["gap"] = f["approx_vc"] - f["lp_bound"]
+    if g.size <= TW_MAX_EDGES:
+        nxg = nx.Graph()
+        nxg.add_edges_from(g.edges())
+        f["treewidth"] = naa.treewidth_min_degree(nxg)[0]
+    return f
+
+# chooses the method for a component from its features
+# model is a decision stump fitted by fit, which is used instead of the
+# bnb and ilp thresholds if given; the DP below its width cap, the clique
+# search above its density and bnb above the ILP edge cap are chosen either
+# way
+class Dispatcher:
+    def __init__(self, thresholds=None, model=None):
+        self.thresholds = dict(THRESHOLDS)
+        if thresholds is not None:
+            self.thresholds.update(thresholds)
+        self.model = model
+
+    @classmethod
+    def load(cls, path=model_file):
+        with open(path) as f:
+            return cls(model=json.load(f))
+
+    def choose(self, f):
+        t = self.thresholds
+        if f["treewidth"] is not None and f["treewidth"] <= t["td_max_width"]:
+            return "td"
+        if f["density"] >= t["clique_min_density"]:
+            return "clique"
+        if f["num_edges"] > t["ilp_max_edges"]:
+            return "bnb"
+        if self.model is not None:
+            m = self.model
+            value = f.get(m["feature"])
+            if value is not None:
+                return m["low"] if value <= m["threshold"] else m["high"]
+        if f["num_vertices"] <= t["bnb_max_vertices"] or f["gap"] <= t["bnb_max_gap"]:
+            return "bnb"
+        return "ilp"
+
+# the dispatcher from model_file if there is one, else the thresholds
+def default():
+    if os.path.exists(model_file):
+        return Dispatcher.load()
+    return Dispatcher()
+
+# component backends, each returns (VC, whether it is minimum) of the
+# component left alive in g, starting from the VC cover of it
+def solve_bnb(g, cover, time_limit, profile, bounds, table):
+    s = engine.Search(g, len(cover), 0, profile, bounds, None, table)
+    deadline = None if time_limit is None else timer() + time_limit
+    if s.run(deadline):
+        return (cover if s.result is None else s.result, True)
+    if s.best_cover is not None and len(s.best_cover) < len(cover):
+        return (s.best_cover, False)
+    return (cover, False)
+
+def solve_ilp(g, cover, time_limit, profile, bounds, table):
+    return ilp_model.solve(g, cover, None if time_limit is None else max(time_limit, 1))
+
+def solve_clique(g, cover, time_limit, profile, bounds, table):
+    return clique.solve(g, cover, time_limit)
+
+def solve_td(g, cover, time_limit, profile, bounds, table):
+    deadline = None if time_limit is None else timer() + time_limit
+    vc = tree_dp.solve(g, deadline=deadline)
+    if vc is None:
+        if deadline is not None:
+            time_limit = max(deadline - timer(), 0)
+        return solve_bnb(g, cover, time_limit, profile, bounds, table)
+    return (vc, True)
+
+BACKENDS = {
+    "bnb": solve_bnb,
+    "ilp": solve_ilp,
+    "td": solve_td,
+    "clique": solve_clique,
+}
+
+# solve every component of the compact graph g with the method the
+# dispatcher picks for it, within time_limit seconds in total
+# cover is a VC of g, e.g. from local search; components where it meets the
+# LP bound are not searched at all
+# returns (VC of g, whether it is minimum)
+def solve(g, cover, time_limit=None, profile=None, bounds=lower_bounds.PROVIDERS,
+          dispatcher=None):
+    if dispatcher is None:
+        dispatcher = default()
+    deadline = None if time_limit is None else timer() + time_limit
+    table = transposition.TranspositionTable()
+    in_cover = set(cover)
+    vc = []
+    optimal = True
+
+    # hide every component and show them one at a time
+    mark = g.mark()
+    ccs = g.components()
+    for cc in ccs:
+        for u in cc:
+            g.hide(u)
+    for cc in ccs:
+        cc_mark = g.mark()
+        for u in cc:
+            g.show(u)
+        cc_cover = [v for v in cc if v in in_cover]
+        f = features(g, cc_cover)
+        if f["gap"] == 0:
+            method = "done"
+            cc_vc, cc_optimal = cc_cover, True
+        else:
+            method = dispatcher.choose(f)
+            remaining = None if deadline is None else max(deadline - timer(), 0)
+            cc_vc, cc_optimal = BACKENDS[method](g, cc_cover, remaining, profile, bounds,
+                                                 table)
+        if profile is not None:
+            profile.count("dispatch_" + method)
+        vc += cc_vc
+        optimal = optimal and cc_optimal
+        g.undo(cc_mark)
+    g.undo(mark)
+    return (vc, optimal)
+
+# fit a decision stump on (features, best method) samples
+# tries every feature and every threshold between observed values and keeps
+# the rule "low method if feature <= threshold else high method" that gets
+# the most samples right
+def fit(samples):
+    best = None
+    methods = sorted(set(label for _, label in samples))
+    names = sorted(set(k for f, _ in samples for k, v in f.items() if v is not None))
+    for name in names:
+        values = sorted(set(f[name] for f, _ in samples if f.get(name) is not None))
+        for threshold in values:
+            for low in methods:
+                for high in methods:
+                    right = sum(1 for f, label in samples if f.get(name) is not None and
+                                label == (low if f[name] <= threshold else high))
+                    if best is None or right > best[0]:
+                        best = (right, {"feature": name, "threshold": threshold,
+                                        "low": low, "high": high})
+    return None if best is None else best[1]
+
+# features of the kernel of an instance file, or None if the kernel is empty
+def instance_features(f):
+    g = c.parse_graph(f, compact=True)
+    for v in g.loops:
+        if g.alive[v]:
+            g.take(v)
+    k = kernel.Kernel(g.adjacency(), g.n + 1).reduce()
+    g, _ = k.graph()
+    if g.size == 0:
+        return None
+    return features(g, g.matching_cover())
+
+# training samples from bench.py result tables of the bnb (branch) and ilp
+# solvers: each instance either solver finished is labeled with the faster one
+def samples(bnb_table, ilp_table):
+    runs = {"bnb": c.read_table(bnb_table), "ilp": c.read_table(ilp_table)}
+    result = []
+    for name in sorted(set(runs["bnb"]) | set(runs["ilp"])):
+        times = {m: float(rows[name][3]) for m, rows in runs.items()
+                 if name in rows and rows[name][0] == "ok"}
+        if not times:
+            continue
+        with open(os.path.join(input_dir, name), encoding="latin-1") as f:
+            fs = instance_features(f)
+        if fs is not None:
+            result.append((fs, min(times, key=times.get)))
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="fit the dispatch model from bench.py results")
+    parser.add_argument("bnb_table", help="bench.py output of the branch solver")
+    parser.add_argument("ilp_table", help="bench.py output of the ilp solver")
+    parser.add_argument("-o", "--output", default=model_file)
+    args = parser.parse_args()
+
+    model = fit(samples(args.bnb_table, args.ilp_table))
+    if model is None:
+        sys.exit("no instance was solved by either solver")
+    with open(args.output, 'w') as out:
+        json.dump(model, out, indent=1)
+    print(model)
@@ -0,0 +1,384 @@
+from timeit import default_timer as timer
+import bitset
+import branching
+import lower_bounds
+import packing
+
+# frame kinds
+NODE = 0 # search node branching on M[v] and N(S[v])
+SPLIT = 1 # disconnected node whose components are solved one after another
+BITSET = 2 # component handed to a bitset.Search
+
+# one open search node on the explicit stack
+# ub is the bound the node's VC has to beat, counted from taken, the number
+# of VC vertices on the trail when the node was entered
+class Frame:
+    def __init__(self, kind, ub, is_split, mark, taken):
+        self.kind = kind
+        self.ub = ub
+        self.is_split = is_split
+        self.mark = mark
+        self.taken = taken
+        self.index = 0 # next branch or component to open
+        self.waiting = False # whether a child has been opened
+        self.best = None # best VC below this node
+        self.branch_mark = 0
+        self.branches = None # NODE: vertex sets taken by each branch
+        self.packs = None # NODE: packing constraints of each branch
+        self.rule = None # NODE: kind of branching, for the telemetry
+        self.ccs = None # SPLIT: components, smallest first
+        self.lbs = None # SPLIT: lower bound of each component
+        self.rest = 0 # SPLIT: lower bounds of the unopened components
+        self.cc_mark = 0
+        self.cc_key = None # SPLIT: table key of the open component, if any
+        self.cc_ub = 0 # SPLIT: bound the open component was searched with
+        self.sub = None # BITSET: the search of the component
+
+# iterative branch-and-bound on the compact graph g
+# the recursion of the old bnb is kept on an explicit stack of frames and
+# all graph changes on the graph's trail, so there is no depth limit and
+# run can stop after a node budget or deadline and be called again to
+# continue where it stopped
+# offset, profile, bounds, incumbent and table are as for branch.search
+# components, and g itself, with at most small vertices are solved by the
+# bitset search instead
+# with use_packing, the branch that takes v keeps a packing constraint that
+# it may not take all of N(v) as well: such a VC is beaten by dropping v,
+# which the branch taking N(v) finds; if v has no mirrors, the branch taking
+# N(v) may not take all of N(u) - N[v] for any u in N(v) either, since
+# swapping u for v gives a VC as small in the branch taking v; components
+# handed to the bitset search keep the constraints
+# rule names the branching rule in branching.RULES; the profile counts the
+# nodes branched on and the branches that found no better VC by the kind
+# of branching, and the seconds spent choosing the branches
+class Search:
+    def __init__(self, g, ub, offset=0, profile=None, bounds=lower_bounds.PROVIDERS,
+                 incumbent=None, table=None, small=bitset.MAX_VERTICES, use_packing=True,
+                 rule="satellite"):
+        self.g = g
+        self.ub = ub
+        self.offset = offset
+        self.profile = profile
+        self.incumbent = incumbent
+        self.table = table
+        self.small = small
+        self.packing = packing.Packing(g) if use_packing else None
+        self.rule_name = rule
+        self.rule = branching.RULES[rule]()
+        self.providers = [b() for b in bounds]
+
+        # track size of best solution encountered, and the solution itself
+        # once the search has found one, as a VC of g from the trail start
+        self.best_sol = offset + g.taken + ub
+        self.best_cover = None
+
+        self.stack = []
+        self.ret = None # VC returned by the last node that finished
+        self.started = False
+        self.done = False
+        self.nodes = 0
+
+    # the VC found, or None if there is none with fewer than ub vertices
+    # or the search is not done, when ret is the VC of whichever node
+    # finished last
+    @property
+    def result(self):
+        return self.ret if self.done else None
+
+    # pickled without the profile and the shared incumbent, which resume
+    # attaches again
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["profile"] = None
+        state["incumbent"] = None
+        return state
+
+    # continue an unpickled search with profile and incumbent
+    def resume(self, profile, incumbent):
+        self.profile = profile
+        self.incumbent = incumbent
+        for frame in self.stack:
+            if frame.kind == BITSET:
+                frame.sub.profile = profile
+
+    # undo the graph and the packing constraint counters to mark
+    def undo(self, mark):
+        self.g.undo(mark)
+        if self.packing is not None:
+            self.packing.undo(mark)
+
+    # record a new best VC
+    def improve(self, size, cover):
+        self.best_sol = size
+        self.best_cover = cover
+        incumbent = self.incumbent
+        if incumbent is not None:
+            with incumbent.get_lock():
+                if size < incumbent.value:
+                    incumbent.value = size
+
+    # search until done, until deadline (a timer() value) has passed or
+    # until nodes more nodes have been entered
+    # returns whether the search is done
+    def run(self, deadline=None, nodes=None):
+        if self.done:
+            return True
+        if nodes is not None:
+            nodes += self.nodes
+        g = self.g
+        stack = self.stack
+        if not self.started:
+            self.started = True
+            if 0 < len(g) <= self.small:
+                self.hand_off(g.vertices(), self.ub, False)
+            else:
+                self.enter(self.ub, False, None)
+
+        while stack:
+            if deadline is not None and timer() > deadline:
+                return False
+            if nodes is not None and self.nodes >= nodes:
+                return False
+
+            frame = stack[-1]
+            if frame.kind == BITSET:
+                sub = frame.sub
+                before = sub.nodes
+                finished = sub.run(deadline, None if nodes is None else nodes - self.nodes)
+                self.nodes += sub.nodes - before
+                if self.profile is not None:
+                    self.profile.count("bitset_nodes", sub.nodes - before)
+                if not finished:
+                    return False
+                stack.pop()
+                self.ret = sub.result
+                if not frame.is_split and self.ret is not None:
+                    size = self.offset + g.taken + len(self.ret)
+                    if size < self.best_sol:
+                        self.improve(size, g.cover() + self.ret)
+            elif frame.kind == NODE:
+                if frame.waiting:
+                    # branch finished
+                    frame.waiting = False
+                    if self.ret is not None:
+                        frame.best = g.cover(frame.mark) + self.ret
+                        frame.ub = len(frame.best)
+                    elif self.profile is not None:
+                        self.profile.count(frame.rule + "_pruned")
+                    self.undo(frame.branch_mark)
+                    if frame.packs is not None:
+                        for _ in frame.packs[frame.index - 1]:
+                            self.packing.pop()
+
+                if frame.index < len(frame.branches):
+                    if frame.packs is not None:
+                        for vs in frame.packs[frame.index]:
+                            self.packing.push(vs, len(vs) - 1)
+                    for u in frame.branches[frame.index]:
+                        g.take(u)
+                    frame.index += 1
+                    frame.waiting = True
+                    self.enter(frame.ub - (g.taken - frame.taken), frame.is_split,
+                               frame.branch_mark)
+                else:
+                    self.undo(frame.mark)
+                    stack.pop()
+                    self.ret = frame.best
+            else:
+                if frame.waiting:
+                    # component finished
+                    frame.waiting = False
+                    if frame.cc_key is not None:
+                        self.table.store(frame.cc_key, frame.cc_ub, self.ret)
+                    self.undo(frame.cc_mark)
+                    if self.ret is None:
+                        self.undo(frame.mark)
+                        stack.pop()
+                        continue
+                    frame.best += self.ret
+
+                if frame.index < len(frame.ccs):
+                    cc = frame.ccs[frame.index]
+                    frame.rest -= frame.lbs[frame.index]
+                    frame.index += 1
+                    frame.cc_mark = g.mark()
+                    for u in cc:
+                        g.show(u)
+                    frame.waiting = True
+                    ub = frame.ub - len(frame.best) - frame.rest
+
+                    # answer components solved before from the table, and
+                    # store answers found while no packing constraint can
+                    # cut off a VC of the component, as the other ones
+                    # cannot change its answer
+                    frame.cc_key = None
+                    table = self.table
+                    if table is not None and len(cc) <= table.max_vertices:
+                        key = table.key(g, cc)
+                        found, self.ret = table.lookup(key, ub)
+                        if found:
+                            if self.profile is not None:
+                                self.profile.count("table")
+                            continue
+                        if self.packing is None or not self.packing.binds(cc):
+                            frame.cc_key = key
+                            frame.cc_ub = ub
+                    if len(cc) <= self.small:
+                        self.hand_off(cc, ub, True)
+                    else:
+                        self.enter(ub, True, g.mark())
+                else:
+                    size = self.offset + frame.taken + len(frame.best)
+                    if not frame.is_split and size < self.best_sol:
+                        self.improve(size, g.cover()[:frame.taken] + frame.best)
+                    self.undo(frame.mark)
+                    stack.pop()
+                    self.ret = frame.best
+
+        self.done = True
+        return True
+
+    # push a frame solving the component vs, all of the remaining graph
+    # unless is_split, with the bitset search, needing a VC smaller than ub
+    def hand_off(self, vs, ub, is_split):
+        if self.profile is not None:
+            self.profile.count("bitset")
+        frame = Frame(BITSET, ub, is_split, self.g.mark(), self.g.taken)
+        packs = None if self.packing is None else self.packing.budgets()
+        frame.sub = bitset.Search(self.g, vs, ub, packs, self.rule_name, self.profile,
+                                  len(self.stack))
+        self.stack.append(frame)
+
+    # enter a search node on the remaining graph, needing a VC smaller than ub
+    # either settles it at once, leaving the answer in ret, or pushes a frame
+    # conn is a trail position at which the graph was known to be connected
+    def enter(self, ub, is_split, conn):
+        g = self.g
+        self.nodes += 1
+        self.ret = None
+        prof = self.profile
+        timed = False
+        if prof is not None:
+            timed = prof.node(len(self.stack))
+
+        # prune against the best VC found by any process
+        incumbent = self.incumbent
+        if incumbent is not None and not is_split:
+            if incumbent.value < self.best_sol:
+                self.best_sol = incumbent.value
+            ub = min(ub, self.best_sol - self.offset - g.taken)
+
+        mark = g.mark()
+        taken = g.taken
+
+        # apply degree-one reduction, also removing isolated vertices, and
+        # propagate the packing constraints until neither changes the graph
+        g.deg_one_redux()
+        if self.packing is not None and len(self.packing):
+            while True:
+                if not self.packing.propagate():
+                    if prof is not None:
+                        prof.count("cut_packing")
+                    self.undo(mark)
+                    return
+                before = g.mark()
+                g.deg_one_redux()
+                if g.mark() == before:
+                    break
+        current = g.taken - taken
+        if timed:
+            prof.lap("reduce")
+
+        # check if graph is empty
+        if g.size == 0:
+            if prof is not None:
+                prof.count("leaf")
+            if current < ub:
+                self.ret = g.cover(mark)
+                if not is_split and self.offset + g.taken < self.best_sol:
+                    self.improve(self.offset + g.taken, g.cover())
+            self.undo(mark)
+            return
+
+        # simple bound check, at least one more vertex is needed
+        if current + 1 >= ub:
+            if prof is not None:
+                prof.count("cut_simple")
+            self.undo(mark)
+            return
+
+        # get relevant instance info
+        max_deg = g.deg[g.max_degree_vertex()]
+
+        # split instance into connected components if relevant
+        # only the removals since the graph was last connected can split it
+        if conn is None or not g.is_connected(conn):
+            ccs = g.components()
+        else:
+            ccs = None
+        if timed:
+            prof.lap("split")
+        if ccs is not None and len(ccs) > 1:
+            if prof is not None:
+                prof.count("split")
+            # solve components smallest first, each within the budget left
+            # after the lower bounds of the components still to come
+            ccs.sort(key=len)
+            lbs = [lower_bounds.matching_size(g, cc) for cc in ccs]
+            if current + sum(lbs) >= ub:
+                if prof is not None:
+                    prof.count("cut_split")
+                self.undo(mark)
+                return
+
+            # hide every component and show them one at a time, so that
+            # no edges are touched
+            frame = Frame(SPLIT, ub, is_split, mark, taken)
+            frame.best = g.cover(mark)
+            frame.ccs = ccs
+            frame.lbs = lbs
+            frame.rest = sum(lbs)
+            for cc in ccs:
+                for u in cc:
+                    g.hide(u)
+            self.stack.append(frame)
+            return
+
+        # bound check from Lemma 2.3 of Cygan et al.
+        # a VC of at most k vertices covers at most k * max_deg edges
+        k = ub - 1 - current
+        if g.size > k * max_deg or len(g) > k * (max_deg + 1):
+            if prof is not None:
+                prof.count("cut_cygan")
+            self.undo(mark)
+            return
+
+        # lower bound check, cheapest provider first
+        for lb in self.providers:
+            if current + lb(g) >= ub:
+                if prof is not None:
+                    prof.count("cut_" + lb.name)
+                    if timed:
+                        prof.lap("bounds")
+                self.undo(mark)
+                return
+        if timed:
+            prof.lap("bounds")
+
+        # pick the branches by the rule
+        if prof is not None:
+            start = timer()
+        kind, branches, packs = self.rule(g)
+        if prof is not None:
+            prof.count(kind + "_branch")
+            prof.add_time(kind + "_branch", timer() - start)
+            if timed:
+                prof.lap("branch")
+
+        frame = Frame(NODE, ub, is_split, mark, taken)
+        frame.branch_mark = g.mark()
+        frame.branches = branches
+        frame.rule = kind
+        if self.packing is not None:
+            frame.packs = packs
+        self.stack.append(frame)
@@ -0,0 +1,243 @@
+import os
+import argparse
+import multiprocessing as mp
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.csgraph as csgraph
+import networkx as nx
+import networkx.algorithms.approximation as naa
+import common as c
+import kernel
+import dispatch
+
+script_dir = os.path.dirname(__file__)
+input_dir = os.path.join(script_dir, "vc-exact-public")
+
+# columns of the feature table, in order
+COLUMNS = [
+    "num_vertices", "num_edges", "self_loops", "isolated",
+    "min_deg", "max_deg", "mean_deg", "median_deg", "deg_one", "deg_two",
+    "num_components", "largest_component",
+    "core_vertices", "core_edges", "degeneracy_ub", "treewidth_ub",
+    "matching", "approx_vc", "lp_bound",
+    "reduced_vertices", "reduced_edges", "reduced_vc",
+    "kernel_vertices", "kernel_edges", "kernel_vc",
+]
+
+# edges of an array from c.load_edges without self loops and duplicates,
+# smaller endpoint first, and the vertices with a self loop
+def normalize(edges):
+    loops = np.unique(edges[edges[:, 0] == edges[:, 1], 0])
+    edges = np.sort(edges[edges[:, 0] != edges[:, 1]], axis=1)
+    return (np.unique(edges, axis=0), loops)
+
+# symmetric adjacency matrix on vertices 0..n of normalized edges,
+# row 0 stays empty
+def adjacency(n, edges):
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    data = np.ones(len(rows), dtype=np.int32)
+    return sp.csr_matrix((data, (rows, cols)), shape=(n + 1, n + 1))
+
+# all neighbors of the vertices vs in the CSR matrix a, with the position
+# in vs each of them belongs to
+def gather(a, vs):
+    starts, ends = a.indptr[vs], a.indptr[vs + 1]
+    counts = ends - starts
+    owner = np.repeat(np.arange(len(vs)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return (a.indices[starts[owner] + offsets], owner)
+
+# vertices of the k-core of a, as a boolean mask
+# each round peels every vertex whose degree dropped to k - 1 or less,
+# only touching the neighbors of the peeled vertices
+def core(a, k):
+    deg = np.diff(a.indptr).astype(np.int64)
+    alive = deg >= k
+    peel = np.flatnonzero((deg < k) & (deg > 0))
+    while len(peel):
+        alive[peel] = False
+        nbrs, _ = gather(a, peel)
+        nbrs = nbrs[alive[nbrs]]
+        np.subtract.at(deg, nbrs, 1)
+        nbrs = np.unique(nbrs)
+        peel = nbrs[deg[nbrs] < k]
+    return alive
+
+# the vertices vs without repeats, in time linear in len(vs) rather than
+# by sorting; stamp is a scratch array over all vertices
+def distinct(vs, stamp):
+    positions = np.arange(len(vs))
+    stamp[vs] = positions
+    return vs[stamp[vs] == positions]
+
+# degree-one reduction in rounds: every vertex whose only neighbor is u puts
+# u into the VC, an isolated edge puts its larger endpoint in
+# the leaves of a round are the neighbors of the vertices the previous round
+# took, so every vertex and edge is handled a constant number of times and
+# the reduction runs in linear time; this is the reduction simple.py uses,
+# Graph.deg_one_redux being the one of the branch-and-bound
+# returns (VC vertices, boolean mask of the vertices left with edges)
+def deg_one_reduce(a):
+    deg = np.diff(a.indptr).astype(np.int64)
+    alive = deg > 0
+    stamp = np.zeros(len(deg), dtype=np.int64)
+    vc = []
+    leaves = np.flatnonzero(deg == 1)
+    while len(leaves):
+        nbrs, owner = gather(a, leaves)
+        keep = alive[nbrs]
+        nbrs, owner = nbrs[keep], owner[keep]
+        v = leaves[owner]
+        pair = (deg[nbrs] == 1) & (v > nbrs)
+        taken = distinct(nbrs[~pair], stamp)
+        vc.append(taken)
+        alive[taken] = False
+        touched, _ = gather(a, taken)
+        touched = touched[alive[touched]]
+        np.subtract.at(deg, touched, 1)
+        touched = distinct(touched, stamp)
+        alive[touched[deg[touched] == 0]] = False
+        leaves = touched[deg[touched] == 1]
+    vc = np.concatenate(vc) if vc else np.zeros(0, dtype=np.int64)
+    return (vc, alive)
+
+# rows of edges whose endpoints are both in the mask alive
+def induced(edges, alive):
+    return edges[alive[edges[:, 0]] & alive[edges[:, 1]]]
+
+# self loop vertices go into the VC first, then the degree-one reduction
+# runs on normalized edges without them
+# returns (VC vertices, edges left)
+def reduce(n, edges, loops):
+    if len(loops):
+        keep = np.ones(n + 1, dtype=bool)
+        keep[loops] = False
+        edges = induced(edges, keep)
+    vc, alive = deg_one_reduce(adjacency(n, edges))
+    return (np.concatenate([loops, vc]), induced(edges, alive))
+
+# size of a maximal matching of normalized edges, in rounds: an edge joins
+# the matching when its random priority is the smallest among the remaining
+# edges at both of its endpoints, and edges at matched vertices are dropped
+def maximal_matching(n, edges, seed=0):
+    m = len(edges)
+    priority = np.random.default_rng(seed).permutation(m)
+    size = 0
+    while len(edges):
+        low = np.full(n + 1, m, dtype=np.int64)
+        np.minimum.at(low, edges[:, 0], priority)
+        np.minimum.at(low, edges[:, 1], priority)
+        chosen = (low[edges[:, 0]] == priority) & (low[edges[:, 1]] == priority)
+        size += int(chosen.sum())
+        matched = np.zeros(n + 1, dtype=bool)
+        matched[edges[chosen].ravel()] = True
+        keep = ~(matched[edges[:, 0]] | matched[edges[:, 1]])
+        edges, priority = edges[keep], priority[keep]
+    return size
+
+# LP lower bound on the VC: half a maximum matching of the bipartite double
+# cover, which is the adjacency matrix read as a biadjacency matrix
+def lp_bound(a):
+    mate = csgraph.maximum_bipartite_matching(a, perm_type="column")
+    return (int((mate >= 0).sum()) + 1) // 2
+
+# min-degree treewidth upper bound of the edges in a 2-core with at most
+# dispatch.TW_MAX_EDGES edges, None for larger ones
+def treewidth_ub(edges):
+    if len(edges) > dispatch.TW_MAX_EDGES:
+        return None
+    g = nx.Graph()
+    g.add_edges_from(edges.tolist())
+    return naa.treewidth_min_degree(g)[0]
+
+# features of the graph on vertices 1..n with the edges of an array from
+# c.load_edges, by column name
+# treewidth_ub is None if the 2-core is too large for the heuristic, and the
+# kernel columns are None with kernelize=False
+def extract(n, edges, kernelize=True):
+    edges, loops = normalize(edges)
+    a = adjacency(n, edges)
+    deg = np.diff(a.indptr)[1:]
+    f = dict.fromkeys(COLUMNS)
+    f["num_vertices"] = n
+    f["num_edges"] = len(edges)
+    f["self_loops"] = len(loops)
+    f["isolated"] = int((deg == 0).sum())
+    f["min_deg"] = int(deg.min()) if n else 0
+    f["max_deg"] = int(deg.max()) if n else 0
+    f["mean_deg"] = round(float(deg.mean()), 5) if n else 0
+    f["median_deg"] = float(np.median(deg)) if n else 0
+    f["deg_one"] = int((deg == 1).sum())
+    f["deg_two"] = int((deg == 2).sum())
+
+    # components of the vertices with edges
+    _, labels = csgraph.connected_components(a, directed=False)
+    sizes = np.bincount(labels[1:][deg > 0])
+    sizes = sizes[sizes > 0]
+    f["num_components"] = len(sizes)
+    f["largest_component"] = int(sizes.max()) if len(sizes) else 0
+
+    # removing vertices of degree at most one leaves the treewidth alone as
+    # long as an edge is left, and every vertex of the degeneracy core has
+    # degree at least the degeneracy and a neighbor in the core
+    alive = core(a, 2)
+    core_edges = induced(edges, alive)
+    f["core_vertices"] = int(alive.sum())
+    f["core_edges"] = len(core_edges)
+    if len(core_edges):
+        core_deg = np.bincount(core_edges.ravel(), minlength=n + 1)
+        f["degeneracy_ub"] = int(np.minimum(core_deg[core_edges[:, 0]],
+                                            core_deg[core_edges[:, 1]]).max())
+        tw = treewidth_ub(core_edges)
+        f["treewidth_ub"] = None if tw is None else max(tw, 1)
+    else:
+        f["degeneracy_ub"] = f["treewidth_ub"] = 1 if len(edges) else 0
+
+    f["matching"] = maximal_matching(n, edges)
+    f["approx_vc"] = 2 * f["matching"]
+    f["lp_bound"] = lp_bound(a)
+
+    # the full kernel only gets what the degree-one reduction left
+    vc, reduced = reduce(n, edges, loops)
+    f["reduced_vertices"] = len(np.unique(reduced))
+    f["reduced_edges"] = len(reduced)
+    f["reduced_vc"] = len(vc)
+    if not kernelize:
+        return f
+    adj = {v: set() for v in np.unique(reduced).tolist()}
+    for u, v in reduced.tolist():
+        adj[u].add(v)
+        adj[v].add(u)
+    k = kernel.Kernel(adj, n + 1).reduce()
+    f["kernel_vertices"] = len(k)
+    f["kernel_edges"] = k.size()
+    f["kernel_vc"] = f["reduced_vc"] + k.offset
+    return f
+
+# values of features from extract in column order, "-" for missing ones
+def row(f):
+    return ["-" if f[k] is None else f[k] for k in COLUMNS]
+
+def instance_row(path):
+    with open(path, encoding="latin-1") as f:
+        return (os.path.basename(path), row(extract(*c.load_edges(f))))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="extract instance features in parallel")
+    parser.add_argument("files", nargs='*',
+                        help="instance files, all of vc-exact-public by default")
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    parser.add_argument("-o", "--output", default="features_output.txt")
+    args = parser.parse_intermixed_args()
+
+    paths = args.files
+    if not paths:
+        with os.scandir(input_dir) as dir:
+            paths = sorted(file.path for file in dir)
+    with mp.Pool(args.jobs) as pool:
+        rows = dict(pool.imap_unordered(instance_row, paths))
+    with open(args.output, 'w') as output:
+        output.write(' '.join(["file_name"] + COLUMNS) + '\n')
+        for name in sorted(rows):
+            output.write(' '.join([name] + [str(x) for x in rows[name]]) + '\n')
@@ -0,0 +1,343 @@
+from array import array
+from bisect import bisect_left
+
+# trail entry kinds
+TAKE = 0 # vertex removed and added to the vertex cover
+DROP = 1 # vertex removed and left out of the vertex cover
+HIDE = 2 # vertex of another component hidden, neighbors untouched
+SHOW = 3 # hidden vertex shown again
+
+# compact graph used by the branch-and-bound
+# adjacency is stored once in CSR form and never modified; vertices are
+# deleted by clearing their alive flag and updating the degree counters of
+# their neighbors, and every deletion is pushed onto a trail so that it can
+# be undone in reverse order when backtracking
+class Graph:
+    def __init__(self, n, edges, vertices=None):
+        # self-loop vertices are kept out of the adjacency and must be
+        # included in any VC
+        nbrs = [[] for _ in range(n + 1)]
+        loops = set()
+        for u, v in edges:
+            if u == v:
+                loops.add(u)
+            else:
+                nbrs[u].append(v)
+                nbrs[v].append(u)
+
+        off = array('l', [0]) * (n + 2)
+        adj = array('l')
+        for v in range(1, n + 1):
+            adj.extend(sorted(set(nbrs[v])))
+            off[v + 1] = len(adj)
+            nbrs[v] = None
+
+        self.n = n
+        self.off = off
+        self.adj = adj
+        self.loops = sorted(loops)
+
+        if vertices is None:
+            vertices = range(1, n + 1)
+        self.alive = bytearray(n + 1)
+        self.deg = array('l', [0]) * (n + 1)
+        for v in vertices:
+            self.alive[v] = 1
+        self.order = 0 # number of alive vertices
+        self.deg_sum = 0 # twice the number of alive edges
+        for v in vertices:
+            d = 0
+            for i in range(off[v], off[v + 1]):
+                d += self.alive[adj[i]]
+            self.deg[v] = d
+            self.order += 1
+            self.deg_sum += d
+
+        # degree buckets as doubly linked lists, -1 terminated
+        # bucket_max is an upper bound on the largest nonempty bucket
+        self.head = array('l', [-1]) * (n + 1)
+        self.next = array('l', [-1]) * (n + 1)
+        self.prev = array('l', [-1]) * (n + 1)
+        self.bucket_max = 0
+        for v in vertices:
+            self._link(v)
+
+        self.trail = array('l')
+        self.taken = 0 # number of TAKE entries on the trail
+
+    def __len__(self):
+        return self.order
+
+    # number of alive edges
+    @property
+    def size(self):
+        return self.deg_sum // 2
+
+    def vertices(self):
+        alive = self.alive
+        return [v for v in range(1, self.n + 1) if alive[v]]
+
+    def neighbors(self, v):
+        alive, adj = self.alive, self.adj
+        return [adj[i] for i in range(self.off[v], self.off[v + 1]) if alive[adj[i]]]
+
+    # remaining graph as a dict of neighbor sets
+    def adjacency(self):
+        return {v: set(self.neighbors(v)) for v in self.vertices()}
+
+    def has_edge(self, u, v):
+        if not (self.alive[u] and self.alive[v]):
+            return False
+        hi = self.off[u + 1]
+        i = bisect_left(self.adj, v, self.off[u], hi)
+        return i < hi and self.adj[i] == v
+
+    def edges(self):
+        alive, adj, off = self.alive, self.adj, self.off
+        for u in range(1, self.n + 1):
+            if alive[u]:
+                for i in range(off[u], off[u + 1]):
+                    v = adj[i]
+                    if v > u and alive[v]:
+                        yield (u, v)
+
+    # add v to the bucket of its current degree
+    def _link(self, v):
+        d = self.deg[v]
+        head, nxt = self.head, self.next
+        u = head[d]
+        nxt[v] = u
+        self.prev[v] = -1
+        if u >= 0:
+            self.prev[u] = v
+        head[d] = v
+        if d > self.bucket_max:
+            self.bucket_max = d
+
+    def _unlink(self, v):
+        p, u = self.prev[v], self.next[v]
+        if p >= 0:
+            self.next[p] = u
+        else:
+            self.head[self.deg[v]] = u
+        if u >= 0:
+            self.prev[u] = p
+
+    def _remove(self, v, kind):
+        alive, adj, deg = self.alive, self.adj, self.deg
+        alive[v] = 0
+        self._unlink(v)
+        for i in range(self.off[v], self.off[v + 1]):
+            u = adj[i]
+            if alive[u]:
+                self._unlink(u)
+                deg[u] -= 1
+                self._link(u)
+        self.order -= 1
+        self.deg_sum -= 2 * deg[v]
+        self.trail.append(4 * v + kind)
+
+    def _restore(self, v):
+        alive, adj, deg = self.alive, self.adj, self.deg
+        for i in range(self.off[v], self.off[v + 1]):
+            u = adj[i]
+            if alive[u]:
+                self._unlink(u)
+                deg[u] += 1
+                self._link(u)
+        alive[v] = 1
+        self._link(v)
+        self.order += 1
+        self.deg_sum += 2 * deg[v]
+
+    # hidden vertices keep their degree, so a whole component has to be
+    # hidden or shown for the degree sum to stay consistent
+    def _hide(self, v):
+        self.alive[v] = 0
+        self._unlink(v)
+        self.order -= 1
+        self.deg_sum -= self.deg[v]
+
+    def _show(self, v):
+        self.alive[v] = 1
+        self._link(v)
+        self.order += 1
+        self.deg_sum += self.deg[v]
+
+    # alive vertices of degree d
+    def bucket(self, d):
+        vs = []
+        if d < len(self.head):
+            v = self.head[d]
+            while v >= 0:
+                vs.append(v)
+                v = self.next[v]
+        return vs
+
+    # an alive vertex of maximum degree, or -1 if the graph is empty
+    def max_degree_vertex(self):
+        head = self.head
+        d = self.bucket_max
+        while d > 0 and head[d] < 0:
+            d -= 1
+        self.bucket_max = d
+        return head[d]
+
+    # remove v and put it in the VC
+    def take(self, v):
+        self._remove(v, TAKE)
+        self.taken += 1
+
+    # remove v without putting it in the VC
+    def drop(self, v):
+        self._remove(v, DROP)
+
+    # hide v along with the rest of its component
+    def hide(self, v):
+        self._hide(v)
+        self.trail.append(4 * v + HIDE)
+
+    # show a hidden v along with the rest of its component
+    def show(self, v):
+        self._show(v)
+        self.trail.append(4 * v + SHOW)
+
+    def mark(self):
+        return len(self.trail)
+
+    # restore every vertex removed since mark, most recent first
+    def undo(self, mark):
+        trail = self.trail
+        while len(trail) > mark:
+            e = trail.pop()
+            kind = e & 3
+            if kind == HIDE:
+                self._show(e >> 2)
+            elif kind == SHOW:
+                self._hide(e >> 2)
+            else:
+                if kind == TAKE:
+                    self.taken -= 1
+                self._restore(e >> 2)
+
+    # vertices put in the VC since mark
+    def cover(self, mark=0):
+        trail = self.trail
+        return [trail[i] >> 2 for i in range(mark, len(trail)) if trail[i] & 3 == TAKE]
+
+    # connected components of the remaining graph
+    def components(self):
+        alive, adj, off = self.alive, self.adj, self.off
+        seen = bytearray(self.n + 1)
+        ccs = []
+        for s in range(1, self.n + 1):
+            if alive[s] and not seen[s]:
+                seen[s] = 1
+                cc = [s]
+                for u in cc:
+                    for i in range(off[u], off[u + 1]):
+                        w = adj[i]
+                        if alive[w] and not seen[w]:
+                            seen[w] = 1
+                            cc.append(w)
+                ccs.append(cc)
+        return ccs
+
+    # whether the remaining graph is connected, given that it was connected
+    # at trail position mark
+    # every component left after the removals since mark contains a neighbor
+    # of a removed vertex, so BFS is run from those neighbors in lockstep and
+    # stops as soon as they have all met or one group has run out
+    def is_connected(self, mark):
+        alive, adj, off, trail = self.alive, self.adj, self.off, self.trail
+        seeds = set()
+        for i in range(mark, len(trail)):
+            if trail[i] & 3 > DROP:
+                continue
+            v = trail[i] >> 2
+            for j in range(off[v], off[v + 1]):
+                if alive[adj[j]]:
+                    seeds.add(adj[j])
+        if len(seeds) <= 1:
+            return True
+
+        # one BFS per seed, merged with union-find when they meet
+        seeds = list(seeds)
+        owner = {}
+        parent = list(range(len(seeds)))
+        running = [1] * len(seeds) # unfinished BFS per group root
+        queues = []
+        for i, s in enumerate(seeds):
+            owner[s] = i
+            queues.append([s])
+        heads = [0] * len(seeds)
+        groups = len(seeds)
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        active = list(range(len(seeds)))
+        while True:
+            still_active = []
+            for i in active:
+                queue = queues[i]
+                if heads[i] == len(queue):
+                    # BFS i is done, its group is a whole component if none
+                    # of its other searches are still running
+                    r = find(i)
+                    running[r] -= 1
+                    if running[r] == 0:
+                        return False
+                    continue
+                still_active.append(i)
+                u = queue[heads[i]]
+                heads[i] += 1
+                for j in range(off[u], off[u + 1]):
+                    w = adj[j]
+                    if not alive[w]:
+                        continue
+                    o = owner.get(w)
+                    if o is None:
+                        owner[w] = i
+                        queue.append(w)
+                    else:
+                        a, b = find(i), find(o)
+                        if a != b:
+                            parent[b] = a
+                            running[a] += running[b]
+                            groups -= 1
+                            if groups == 1:
+                                return True
+            active = still_active
+
+    # degree-one reduction using a worklist of vertices whose degree dropped
+    # also removes isolated vertices
+    def deg_one_redux(self):
+        alive, deg = self.alive, self.deg
+        stack = self.bucket(0) + self.bucket(1)
+        while stack:
+            v = stack.pop()
+            if not alive[v]:
+                continue
+            if deg[v] == 0:
+                self.drop(v)
+            elif deg[v] == 1:
+                u = self.neighbors(v)[0]
+                ws = self.neighbors(u)
+                self.take(u)
+                for w in ws:
+                    if deg[w] <= 1:
+                        stack.append(w)
+
+    # endpoints of a maximal matching, a 2-approximate VC
+    def matching_cover(self):
+        matched = bytearray(self.n + 1)
+        vc = []
+        for u, v in self.edges():
+            if not matched[u] and not matched[v]:
+                matched[u] = matched[v] = 1
+                vc += [u, v]
+        return vc
@@ -1,42 +1,44 @@
 import os
 from timeit import default_timer as timer
-import pulp
+import common as c
+import branch
+import solution_cache
 
 script_dir = os.path.dirname(__file__)
 input_dir = os.path.join(script_dir, "vc-exact-public")
 
-with open("ilp_output.txt", 'w') as output:
-    output.write("file_name vc_size\n")
-    with os.scandir(input_dir) as dir:
-        for file in dir:
-            with open(file, encoding="latin-1") as f:
-                start = timer()
-                prob = pulp.LpProblem("VC", pulp.LpMinimize)
-                for line in f:
-                    if line[0] == 'p':
-                        s = line.split()
-                        v = int(s[2])
-                        vs = pulp.LpVariable.dicts("vertices", [n for n in range(1, v + 1)],
-                                                   lowBound=0, upBound=1, cat="Integer")
-                        # add objective function
-                        prob += pulp.lpSum([vs[i] for i in range(1, v + 1)])
-                    elif line[0] != 'c':
-                        e = line.split()
-                        # add edge constraint
-                        prob += pulp.lpSum(vs[int(e[0])] + vs[int(e[1])]) >= 1
-                #pulp.LpSolverDefault.msg = 1
-                try: # attempt to solve ILP
-                    prob.solve()
-                    end = timer()
-                    run_time = end - start
-                    if prob.status != 1: # check if prob is optimal
-                        data = ' '.join([str(file.name), '0'])
-                    else:
-                        data = ' '.join([str(file.name),
-                                         str(int(pulp.value(prob.objective))),
-                                         str(run_time)])
-                    output.write(data + '\n')
-                except: # continue even if solver errors out
-                    data = ' '.join([str(file.name), '-1'])
-                    output.write(data + '\n')
-                print(str(file.name) + " done")
+# solve the VC ILP for the graph in file
+# the instance is reduced to a kernel first and only the kernel goes to the
+# ILP solver, see ilp_model.solve
+# returns the VC size, or 0 if the solver did not prove optimality within
+# time_limit seconds
+# solutions is an optional SolutionCache to answer from and store into
+def solve(f, solutions=None, time_limit=None):
+    g = c.parse_graph(f, compact=True)
+    try:
+        vc = branch.solve(g, timeout=time_limit, solutions=solutions, method="ilp")
+    except ValueError:
+        return 0
+    return len(vc)
+
+if __name__ == "__main__":
+    solutions = solution_cache.SolutionCache()
+    with open("ilp_output.txt", 'w') as output:
+        output.write("file_name vc_size\n")
+        with os.scandir(input_dir) as dir:
+            for file in dir:
+                with open(file, encoding="latin-1") as f:
+                    start = timer()
+                    try: # attempt to solve ILP
+                        vc = solve(f, solutions)
+                        end = timer()
+                        run_time = end - start
+                        if vc == 0:
+                            data = ' '.join([str(file.name), '0'])
+                        else:
+                            data = ' '.join([str(file.name), str(vc), str(run_time)])
+                        output.write(data + '\n')
+                    except: # continue even if solver errors out
+                        data = ' '.join([str(file.name), '-1'])
+                        output.write(data + '\n')
+                    print(str(file.name) + " done")
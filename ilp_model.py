@@ -0,0 +1,155 @@
+from collections import deque
+from timeit import default_timer as timer
+import pulp
+
+# odd cycles longer than this are not added as cuts
+MAX_CYCLE = 9
+# cuts are separated in at most this many rounds, each adding the rows most
+# violated at the LP optimum, at most MAX_CUTS of them; more rounds or rows
+# slow CBC down on the public instances, e.g. 5 rounds of 50 rows turn
+# vc-exact_109 from solved in 44s into a timeout at 60s
+SEPARATION_ROUNDS = 1
+MAX_CUTS = 20
+
+# greedy clique cover of the compact graph g, highest degree first
+# returns the cliques with at least three vertices
+def clique_cover(g):
+    deg = g.deg
+    cliques = []
+    clique_of = {}
+    for v in sorted(g.vertices(), key=deg.__getitem__, reverse=True):
+        # count the neighbors of v in each clique built so far
+        hits = {}
+        for u in g.neighbors(v):
+            i = clique_of.get(u)
+            if i is not None:
+                hits[i] = hits.get(i, 0) + 1
+        for i, k in hits.items():
+            if k == len(cliques[i]):
+                cliques[i].append(v)
+                clique_of[v] = i
+                break
+        else:
+            clique_of[v] = len(cliques)
+            cliques.append([v])
+    return [q for q in cliques if len(q) >= 3]
+
+# odd cycle closed by the edge (a, b) between two vertices on the same level
+# of a BFS tree, through their lowest common ancestor
+def tree_cycle(parent, a, b):
+    left, right = [a], [b]
+    while a != b:
+        a, b = parent[a], parent[b]
+        left.append(a)
+        right.append(b)
+    return left + right[-2::-1]
+
+# short odd cycles of g other than triangles, which the clique cuts cover
+# a BFS from each vertex stops at the first edge joining two vertices on the
+# same level that closes an odd cycle longer than a triangle
+def odd_cycles(g, max_len=MAX_CYCLE):
+    cycles = set()
+    for r in g.vertices():
+        level = {r: 0}
+        parent = {r: r}
+        queue = deque([r])
+        found = None
+        while queue and found is None:
+            v = queue.popleft()
+            if 2 * level[v] + 1 > max_len:
+                break
+            for u in g.neighbors(v):
+                if u not in level:
+                    level[u] = level[v] + 1
+                    parent[u] = v
+                    queue.append(u)
+                elif level[u] == level[v] and u < v:
+                    cycle = tree_cycle(parent, v, u)
+                    if len(cycle) > 3:
+                        found = cycle
+                        break
+        if found is not None:
+            cycles.add(tuple(sorted(found)))
+    return [list(cycle) for cycle in cycles]
+
+# clique and odd-cycle rows of g as (vertices, right-hand side): every greedy
+# clique Q gives sum(Q) >= |Q| - 1 and every short odd cycle C gives
+# sum(C) >= (|C| + 1) / 2
+def cut_rows(g):
+    rows = [(q, len(q) - 1) for q in clique_cover(g)]
+    rows += [(cycle, (len(cycle) + 1) // 2) for cycle in odd_cycles(g)]
+    return rows
+
+# add the rows of pool to prob that the LP relaxation violates, in rounds
+# of at most MAX_CUTS of the most violated ones, until none is violated, the
+# rounds are used up or deadline (a timer() value) has passed
+def separate(prob, x, pool, deadline):
+    added = 0
+    for _ in range(SEPARATION_ROUNDS):
+        if not pool or deadline is not None and timer() > deadline:
+            return
+        time_limit = None if deadline is None else max(deadline - timer(), 1)
+        prob.solve(pulp.PULP_CBC_CMD(msg=False, mip=False, timeLimit=time_limit))
+        if prob.sol_status != pulp.LpSolutionOptimal:
+            return
+        value = {v: var.varValue or 0 for v, var in x.items()}
+        slack = [rhs - sum(value[v] for v in vs) for vs, rhs in pool]
+        order = sorted(range(len(pool)), key=slack.__getitem__, reverse=True)
+        violated = [i for i in order[:MAX_CUTS] if slack[i] > 1e-6]
+        if not violated:
+            return
+        rows = {}
+        for i in violated:
+            vs, rhs = pool[i]
+            rows["cut%d" % added] = pulp.LpConstraint(
+                pulp.LpAffineExpression([(x[v], 1) for v in vs]), pulp.LpConstraintGE, rhs=rhs)
+            added += 1
+        prob.extend(rows)
+        chosen = set(violated)
+        pool = [row for i, row in enumerate(pool) if i not in chosen]
+
+# minimum VC of the compact graph g by ILP
+# with cuts, rows of cut_rows are separated against the LP relaxation
+# before the ILP is solved; all of them cut off the all-half LP solution
+# that kernels after the LP reduction have, but adding all of them at once
+# slows down every LP that CBC solves by more than the tighter bound gains
+# (vc-exact_009 ended at 138 instead of 137 in 60s), so each round only adds
+# the most violated ones
+# incumbent is an optional VC of g given to CBC as a warm start, and
+# time_limit in seconds stops CBC early
+# returns the best VC found and whether it is proven minimum
+def solve(g, incumbent=None, time_limit=None, cuts=True):
+    deadline = None if time_limit is None else timer() + time_limit
+    vs = g.vertices()
+    prob = pulp.LpProblem("VC", pulp.LpMinimize)
+    x = {v: pulp.LpVariable("x%d" % v, cat="Binary") for v in vs}
+    prob.setObjective(pulp.LpAffineExpression([(x[v], 1) for v in vs]))
+
+    # build all constraints directly instead of through lpSum and +=
+    rows = {}
+    for i, (u, v) in enumerate(g.edges()):
+        rows["e%d" % i] = pulp.LpConstraint(
+            pulp.LpAffineExpression([(x[u], 1), (x[v], 1)]), pulp.LpConstraintGE, rhs=1)
+    prob.extend(rows)
+    if cuts:
+        separate(prob, x, cut_rows(g), deadline)
+
+    if incumbent is not None:
+        in_vc = set(incumbent)
+        for v in vs:
+            x[v].setInitialValue(1 if v in in_vc else 0)
+    if deadline is not None:
+        time_limit = max(deadline - timer(), 1)
+    solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit,
+                               warmStart=incumbent is not None)
+    prob.solve(solver)
+
+    optimal = prob.sol_status == pulp.LpSolutionOptimal
+    vc = [v for v in vs if x[v].varValue is not None and x[v].varValue > 0.5]
+    in_vc = set(vc)
+    if any(u not in in_vc and w not in in_vc for u, w in g.edges()):
+        # stopped before finding any VC
+        return (list(incumbent) if incumbent is not None else vs, False)
+    if incumbent is not None and len(incumbent) < len(vc):
+        return (list(incumbent), False)
+    return (vc, optimal)
@@ -0,0 +1,76 @@
+import csv
+import json
+from collections import Counter
+from timeit import default_timer as timer
+
+# instrumentation for one branch-and-bound run
+# the solver only calls into a Profile when it is given one, so a run
+# without a profile pays a single None check per hook
+# counts holds events by name (reduction rules, cuts, table hits, ...),
+# depths the number of search nodes entered at each stack depth, and times
+# the seconds spent in each phase of a node, measured on every sample-th
+# node only so that the timer calls do not distort the run
+class Profile:
+    def __init__(self, sample=64):
+        self.sample = sample
+        self.counts = Counter()
+        self.nodes = 0
+        self.depths = Counter()
+        self.sampled = 0
+        self.times = Counter()
+        self.totals = Counter() # seconds of one-off steps, e.g. the kernel
+        self.last = 0
+
+    def count(self, name, k=1):
+        self.counts[name] += k
+
+    # record a node at depth, returns whether its phases are to be timed
+    def node(self, depth):
+        self.nodes += 1
+        self.depths[depth] += 1
+        if self.nodes % self.sample:
+            return False
+        self.sampled += 1
+        self.last = timer()
+        return True
+
+    # charge the time since the last lap to phase
+    def lap(self, phase):
+        now = timer()
+        self.times[phase] += now - self.last
+        self.last = now
+
+    def add_time(self, name, seconds):
+        self.totals[name] += seconds
+
+    # all measurements, with the sampled phase times scaled up to all nodes
+    def as_dict(self):
+        scale = self.nodes / self.sampled if self.sampled else 0
+        return {
+            "nodes": self.nodes,
+            "counts": dict(self.counts),
+            "depths": {str(d): n for d, n in sorted(self.depths.items())},
+            "sampled": self.sampled,
+            "times": dict(self.times),
+            "estimated_times": {p: t * scale for p, t in self.times.items()},
+            "totals": dict(self.totals),
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as out:
+            json.dump(self.as_dict(), out, indent=1)
+
+    # one row per measurement: kind (count, depth, time, total), name, value
+    def write_csv(self, path):
+        with open(path, 'w', newline='') as out:
+            w = csv.writer(out)
+            w.writerow(["kind", "name", "value"])
+            w.writerow(["count", "nodes", self.nodes])
+            for name, n in sorted(self.counts.items()):
+                w.writerow(["count", name, n])
+            for d, n in sorted(self.depths.items()):
+                w.writerow(["depth", d, n])
+            for phase, t in sorted(self.times.items()):
+                w.writerow(["time", phase, t])
+            for name, t in sorted(self.totals.items()):
+                w.writerow(["total", name, t])
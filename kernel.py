@@ -0,0 +1,292 @@
+from graph import Graph
+
+# reconstruction log entry kinds
+FOLD = 0 # degree-2 vertex folded with its two neighbors
+TWIN = 1 # degree-3 twins folded with their common neighborhood
+
+RULES = ["deg_zero", "deg_one", "deg_two", "domination", "twin", "crown", "lp"]
+
+# maximum matching in the bipartite graph with left vertices left and right
+# neighbors adj[u], using the Hopcroft-Karp phases
+# mate_l and mate_r may hold a partial matching to start from and are
+# updated in place
+def max_matching(adj, left, mate_l, mate_r):
+    while True:
+        # layer the free left vertices and everything reachable from them
+        free = [u for u in left if u not in mate_l]
+        dist = dict.fromkeys(free, 0)
+        queue = free[:]
+        found = False
+        for u in queue:
+            for w in adj[u]:
+                x = mate_r.get(w)
+                if x is None:
+                    found = True
+                elif x not in dist:
+                    dist[x] = dist[u] + 1
+                    queue.append(x)
+        if not found:
+            return len(mate_l)
+
+        # augment along vertex-disjoint shortest paths with an explicit stack
+        for root in free:
+            path = []
+            stack = [(root, iter(adj[root]))]
+            while stack:
+                u, it = stack[-1]
+                for w in it:
+                    x = mate_r.get(w)
+                    if x is None:
+                        path.append(w)
+                        for (u, _), w in zip(stack, path):
+                            mate_l[u] = w
+                            mate_r[w] = u
+                        stack = []
+                        break
+                    if dist.get(x) == dist[u] + 1:
+                        path.append(w)
+                        stack.append((x, iter(adj[x])))
+                        break
+                else:
+                    # dead end, never enter u again in this phase
+                    dist[u] = -1
+                    stack.pop()
+                    if path:
+                        path.pop()
+
+# exhaustive reductions on a graph given as a dict of neighbor sets
+# vertices forced into the VC are collected in cover, folded vertices get
+# fresh ids from next_id and are recorded in log so that unfold can turn a
+# VC of the kernel into a VC of the original graph
+class Kernel:
+    def __init__(self, adj, next_id=None):
+        self.adj = {v: set(nbrs) for v, nbrs in adj.items()}
+        if next_id is None:
+            next_id = max(self.adj, default=0) + 1
+        self.next_id = next_id
+        self.cover = []
+        self.log = []
+        # VC vertices accounted for outside the kernel
+        self.offset = 0
+        self.counts = dict.fromkeys(RULES, 0)
+        self.dirty = list(self.adj)
+        self.is_dirty = set(self.dirty)
+
+    def __len__(self):
+        return len(self.adj)
+
+    def size(self):
+        return sum(len(nbrs) for nbrs in self.adj.values()) // 2
+
+    def _touch(self, v):
+        if v not in self.is_dirty:
+            self.is_dirty.add(v)
+            self.dirty.append(v)
+
+    def _remove(self, v):
+        for u in self.adj.pop(v):
+            self.adj[u].discard(v)
+            self._touch(u)
+
+    def _take(self, v):
+        self.cover.append(v)
+        self.offset += 1
+        self._remove(v)
+
+    # replace vertices vs by a single new vertex adjacent to nbrs
+    def _merge(self, vs, nbrs):
+        for v in vs:
+            self._remove(v)
+        x = self.next_id
+        self.next_id += 1
+        nbrs = nbrs.difference(vs)
+        self.adj[x] = nbrs
+        for u in nbrs:
+            self.adj[u].add(x)
+            self._touch(u)
+        self._touch(x)
+        return x
+
+    # run all rules until none applies
+    def reduce(self):
+        while True:
+            self._reduce_local()
+            if self._crown() or self._lp():
+                continue
+            return self
+
+    # degree-based, domination and twin rules, driven by the dirty list
+    def _reduce_local(self):
+        adj = self.adj
+        while self.dirty:
+            v = self.dirty.pop()
+            self.is_dirty.discard(v)
+            if v not in adj:
+                continue
+            nv = adj[v]
+            d = len(nv)
+            if d == 0:
+                self.counts["deg_zero"] += 1
+                self._remove(v)
+            elif d == 1:
+                self.counts["deg_one"] += 1
+                self._take(next(iter(nv)))
+                self._remove(v)
+            elif d == 2:
+                self.counts["deg_two"] += 1
+                a, b = nv
+                if b in adj[a]:
+                    # triangle, a and b can always be taken
+                    self._take(a)
+                    self._take(b)
+                    self._remove(v)
+                else:
+                    x = self._merge((v, a, b), adj[a] | adj[b])
+                    self.log.append((FOLD, v, a, b, x))
+                    self.offset += 1
+            elif self._dominate(v):
+                self.counts["domination"] += 1
+            elif d == 3:
+                self._twin(v)
+
+    # take a neighbor u of v with N[v] contained in N[u]
+    def _dominate(self, v):
+        adj = self.adj
+        nv = adj[v]
+        d = len(nv)
+        for u in nv:
+            nu = adj[u]
+            if len(nu) >= d and len(nv.difference(nu)) == 1:
+                self._take(u)
+                return True
+        return False
+
+    # degree-3 vertices u and v with N(u) == N(v)
+    def _twin(self, v):
+        adj = self.adj
+        nv = adj[v]
+        a = next(iter(nv))
+        for u in adj[a]:
+            if u != v and len(adj[u]) == 3 and adj[u] == nv:
+                break
+        else:
+            return False
+        self.counts["twin"] += 1
+        a, b, c = nv
+        if b in adj[a] or c in adj[a] or c in adj[b]:
+            # some vertex of N(v) is uncovered unless all of N(v) is taken
+            for w in (a, b, c):
+                self._take(w)
+        else:
+            x = self._merge((u, v, a, b, c), adj[a] | adj[b] | adj[c])
+            self.log.append((TWIN, u, v, a, b, c, x))
+            self.offset += 2
+        return True
+
+    # crown reduction: an independent set I and H = N(I) matched into I,
+    # in which case H can be taken and I removed
+    def _crown(self):
+        adj = self.adj
+        matched = set()
+        for u in adj:
+            if u not in matched:
+                for w in adj[u]:
+                    if w not in matched:
+                        matched.add(u)
+                        matched.add(w)
+                        break
+        outsiders = [u for u in adj if u not in matched]
+        if not outsiders:
+            return False
+
+        # outsiders are independent, so their neighbors are all matched
+        mate_l, mate_r = {}, {}
+        max_matching(adj, outsiders, mate_l, mate_r)
+        crown = [u for u in outsiders if u not in mate_l]
+        if not crown:
+            return False
+
+        in_crown = set(crown)
+        head = set()
+        frontier = crown
+        while frontier:
+            new = []
+            for u in frontier:
+                for w in adj[u]:
+                    if w not in head:
+                        head.add(w)
+                        x = mate_r[w]
+                        if x not in in_crown:
+                            in_crown.add(x)
+                            new.append(x)
+            frontier = new
+
+        self.counts["crown"] += 1
+        for w in head:
+            self._take(w)
+        for u in in_crown:
+            self._remove(u)
+        return True
+
+    # Nemhauser-Trotter reduction from a half-integral optimum of the LP
+    # relaxation, read off a minimum VC of the bipartite double cover
+    def _lp(self):
+        adj = self.adj
+        mate_l, mate_r = {}, {}
+        max_matching(adj, adj, mate_l, mate_r)
+
+        # Konig: left vertices reachable from free left vertices by
+        # alternating paths are outside the cover, reachable right ones in it
+        reach_l = set(u for u in adj if u not in mate_l)
+        reach_r = set()
+        queue = list(reach_l)
+        for u in queue:
+            for w in adj[u]:
+                if w not in reach_r:
+                    reach_r.add(w)
+                    x = mate_r[w]
+                    if x not in reach_l:
+                        reach_l.add(x)
+                        queue.append(x)
+
+        # x_v = 1 if both copies are in the cover, 0 if neither is
+        ones = [v for v in adj if v not in reach_l and v in reach_r]
+        zeros = [v for v in adj if v in reach_l and v not in reach_r]
+        if not ones and not zeros:
+            return False
+
+        self.counts["lp"] += 1
+        for v in ones:
+            self._take(v)
+        for v in zeros:
+            self._remove(v)
+        return True
+
+    # compact graph of the kernel and the kernel vertex of each of its ids
+    def graph(self):
+        labels = [None] + sorted(self.adj)
+        index = {v: i for i, v in enumerate(labels)}
+        edges = [(index[u], index[w]) for u in self.adj for w in self.adj[u] if u < w]
+        return (Graph(len(labels) - 1, edges), labels)
+
+    # turn a VC of the kernel into a VC of the graph the kernel was built from
+    def unfold(self, vc):
+        vc = set(vc)
+        vc.update(self.cover)
+        for entry in reversed(self.log):
+            x = entry[-1]
+            if entry[0] == FOLD:
+                _, v, a, b, _ = entry
+                if x in vc:
+                    vc.discard(x)
+                    vc.update((a, b))
+                else:
+                    vc.add(v)
+            else:
+                _, u, v, a, b, c, _ = entry
+                if x in vc:
+                    vc.discard(x)
+                    vc.update((a, b, c))
+                else:
+                    vc.update((u, v))
+        return vc
@@ -0,0 +1,189 @@
+import random
+from timeit import default_timer as timer
+
+# NuMVC local search (Cai et al. 2013) for small vertex covers
+# edges are weighted, uncovered edges gain weight every step, and the search
+# swaps one vertex out of and one vertex into the candidate set C per step,
+# so that C is a VC whenever no edge is left uncovered
+# the graph is copied on construction, so g may change afterwards
+class NuMVC:
+    def __init__(self, g, cover, seed=0, gamma=None, rho=0.3):
+        n = g.n
+        self.rng = random.Random(seed)
+        self.edges = list(g.edges())
+        self.inc = [[] for _ in range(n + 1)]
+        for i, (u, v) in enumerate(self.edges):
+            self.inc[u].append(i)
+            self.inc[v].append(i)
+        self.weight = [1] * len(self.edges)
+        self.total = len(self.edges)
+        # forget edge weights once their average reaches gamma
+        self.gamma = gamma if gamma is not None else max(len(g) // 2, 2)
+        self.rho = rho
+
+        self.in_c = bytearray(n + 1)
+        self.dscore = [0] * (n + 1)
+        self.conf = bytearray([1]) * (n + 1)
+        self.age = [0] * (n + 1)
+        self.members = []
+        self.mpos = [-1] * (n + 1)
+        self.uncovered = list(range(len(self.edges)))
+        self.upos = list(range(len(self.edges)))
+        self.steps = 0
+
+        # uncovered edges make their endpoints attractive
+        for u, v in self.edges:
+            self.dscore[u] += 1
+            self.dscore[v] += 1
+        for v in cover:
+            if not self.in_c[v]:
+                self.add(v)
+        # drop vertices whose edges are all covered twice
+        for v in list(self.members):
+            if self.dscore[v] == 0:
+                self.remove(v)
+        self.best = list(self.members)
+
+    def _cover_edge(self, e):
+        i = self.upos[e]
+        last = self.uncovered.pop()
+        if last != e:
+            self.uncovered[i] = last
+            self.upos[last] = i
+        self.upos[e] = -1
+
+    def _uncover_edge(self, e):
+        self.upos[e] = len(self.uncovered)
+        self.uncovered.append(e)
+
+    def add(self, v):
+        edges, weight, in_c, dscore = self.edges, self.weight, self.in_c, self.dscore
+        in_c[v] = 1
+        dscore[v] = -dscore[v]
+        self.mpos[v] = len(self.members)
+        self.members.append(v)
+        for e in self.inc[v]:
+            a, b = edges[e]
+            u = b if a == v else a
+            if in_c[u]:
+                dscore[u] += weight[e]
+            else:
+                dscore[u] -= weight[e]
+                self._cover_edge(e)
+
+    def remove(self, v):
+        edges, weight, in_c, dscore = self.edges, self.weight, self.in_c, self.dscore
+        in_c[v] = 0
+        dscore[v] = -dscore[v]
+        i = self.mpos[v]
+        last = self.members.pop()
+        if last != v:
+            self.members[i] = last
+            self.mpos[last] = i
+        self.mpos[v] = -1
+        for e in self.inc[v]:
+            a, b = edges[e]
+            u = b if a == v else a
+            if in_c[u]:
+                dscore[u] -= weight[e]
+            else:
+                dscore[u] += weight[e]
+                self._uncover_edge(e)
+
+    # vertex of C with the highest dscore, the oldest one on ties
+    def _select_removal(self):
+        dscore, age = self.dscore, self.age
+        best = -1
+        for v in self.members:
+            if best < 0 or dscore[v] > dscore[best] or \
+               (dscore[v] == dscore[best] and age[v] < age[best]):
+                best = v
+        return best
+
+    # scale all weights by rho and recompute the scores
+    def _forget(self):
+        edges, weight, in_c = self.edges, self.weight, self.in_c
+        dscore = self.dscore
+        for v in range(len(dscore)):
+            dscore[v] = 0
+        self.total = 0
+        for e, (u, v) in enumerate(edges):
+            w = max(int(weight[e] * self.rho), 1)
+            weight[e] = w
+            self.total += w
+            if in_c[u] and not in_c[v]:
+                dscore[u] -= w
+            elif in_c[v] and not in_c[u]:
+                dscore[v] -= w
+            elif not in_c[u] and not in_c[v]:
+                dscore[u] += w
+                dscore[v] += w
+
+    # improving covers, smallest last, until deadline (a timer() value) has
+    # passed or steps more steps have been made
+    def covers(self, deadline=None, steps=None):
+        if steps is not None:
+            steps += self.steps
+        rng = self.rng
+        conf, dscore, age = self.conf, self.dscore, self.age
+        while self.edges:
+            if not self.uncovered:
+                # C is a VC, keep it and try one vertex fewer
+                if len(self.members) < len(self.best):
+                    self.best = list(self.members)
+                    yield self.best
+                if not self.members:
+                    return
+                v = self._select_removal()
+                self.remove(v)
+                conf[v] = 0
+                continue
+
+            self.steps += 1
+            if steps is not None and self.steps > steps:
+                return
+            if deadline is not None and self.steps % 64 == 0 and timer() > deadline:
+                return
+
+            # swap a vertex out of C for an endpoint of an uncovered edge
+            u = self._select_removal()
+            self.remove(u)
+            conf[u] = 0
+            age[u] = self.steps
+            for e in self.inc[u]:
+                a, b = self.edges[e]
+                conf[b if a == u else a] = 1
+
+            a, b = self.edges[self.uncovered[rng.randrange(len(self.uncovered))]]
+            if not conf[a]:
+                v = b
+            elif not conf[b]:
+                v = a
+            elif dscore[a] > dscore[b] or (dscore[a] == dscore[b] and age[a] < age[b]):
+                v = a
+            else:
+                v = b
+            self.add(v)
+            age[v] = self.steps
+            for e in self.inc[v]:
+                x, y = self.edges[e]
+                conf[y if x == v else x] = 1
+
+            # uncovered edges gain weight
+            for e in self.uncovered:
+                self.weight[e] += 1
+                x, y = self.edges[e]
+                dscore[x] += 1
+                dscore[y] += 1
+            self.total += len(self.uncovered)
+            if self.total >= self.gamma * len(self.edges):
+                self._forget()
+
+    # run for time_limit seconds, returns the smallest VC found so far
+    def run(self, time_limit=None, steps=None):
+        deadline = None
+        if time_limit is not None:
+            deadline = timer() + time_limit
+        for _ in self.covers(deadline, steps):
+            pass
+        return self.best
@@ -0,0 +1,107 @@
+from kernel import max_matching
+
+# lower bounds on the VC size of the remaining graph of a compact Graph
+# each provider is called at every search node; the matching providers
+# start from the matching of the previous node where it is still alive and
+# only augment it, while the clique cover is rebuilt at every node
+
+# size of a maximal matching, every matched edge needs its own VC vertex
+# the previous matching is kept where both endpoints are still alive and
+# then extended greedily
+class MatchingBound:
+    name = "matching"
+
+    def __init__(self):
+        self.g = None
+
+    def __call__(self, g):
+        alive, adj, off = g.alive, g.adj, g.off
+        if self.g is not g:
+            self.g = g
+            self.mate = [0] * (g.n + 1)
+        mate = self.mate
+        vs = g.vertices()
+        for v in vs:
+            u = mate[v]
+            if u and alive[u] and mate[u] == v:
+                continue
+            mate[v] = 0
+            for i in range(off[v], off[v + 1]):
+                u = adj[i]
+                w = mate[u]
+                if alive[u] and (w == 0 or not alive[w] or mate[w] != u):
+                    mate[v], mate[u] = u, v
+                    break
+        return sum(1 for v in vs if mate[v] and alive[mate[v]] and mate[mate[v]] == v) // 2
+
+# size of a greedy maximal matching among the vertices vs
+def matching_size(g, vs):
+    alive, adj, off = g.alive, g.adj, g.off
+    matched = set()
+    for v in vs:
+        if v not in matched:
+            for i in range(off[v], off[v + 1]):
+                u = adj[i]
+                if alive[u] and u not in matched:
+                    matched.add(u)
+                    matched.add(v)
+                    break
+    return len(matched) // 2
+
+# n minus the number of cliques in a greedy clique cover, since a VC
+# contains all but at most one vertex of every clique
+class CliqueCoverBound:
+    name = "clique"
+
+    def __call__(self, g):
+        deg = g.deg
+        clique = [0] * (g.n + 1)
+        sizes = [0]
+        count = [0]
+        for v in sorted(g.vertices(), key=deg.__getitem__):
+            # count the neighbors of v in each clique built so far
+            touched = []
+            for u in g.neighbors(v):
+                c = clique[u]
+                if c:
+                    if count[c] == 0:
+                        touched.append(c)
+                    count[c] += 1
+            best = 0
+            for c in touched:
+                if count[c] == sizes[c] and (best == 0 or sizes[c] > sizes[best]):
+                    best = c
+                count[c] = 0
+            if best == 0:
+                sizes.append(0)
+                count.append(0)
+                best = len(sizes) - 1
+            clique[v] = best
+            sizes[best] += 1
+        return len(g) - (len(sizes) - 1)
+
+# value of the half-integral LP relaxation, half the size of a maximum
+# matching in the bipartite double cover
+# the previous matching is repaired and augmented with Hopcroft-Karp; the
+# adjacency is read anew, as the search for augmenting paths reaches most
+# of the graph whenever the matching is already maximum
+class LPBound:
+    name = "lp"
+
+    def __init__(self):
+        self.g = None
+
+    def __call__(self, g):
+        if self.g is not g:
+            self.g = g
+            self.mate_l, self.mate_r = {}, {}
+        alive = g.alive
+        mate_l = {u: w for u, w in self.mate_l.items() if alive[u] and alive[w]}
+        mate_r = {w: u for u, w in mate_l.items()}
+        adj = {v: g.neighbors(v) for v in g.vertices()}
+        size = max_matching(adj, adj, mate_l, mate_r)
+        self.mate_l, self.mate_r = mate_l, mate_r
+        return (size + 1) // 2
+
+# providers in the order they are tried, cheapest first
+PROVIDERS = [MatchingBound, CliqueCoverBound, LPBound]
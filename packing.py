@@ -0,0 +1,93 @@
+from graph import TAKE
+
+# packing constraints of Akiba and Iwata on the compact graph g
+# a constraint allows at most limit of its vertices to be taken from the
+# moment it was pushed; constraints are pushed and popped in stack order by
+# the search, and their counters follow the graph's trail, so that undoing
+# the graph to a mark also undoes the counting done since
+class Packing:
+    def __init__(self, g):
+        self.g = g
+        self.sets = []
+        self.limits = []
+        self.counts = []
+        self.watch = {} # vertex -> constraints on it
+        self.log = [] # (trail position, constraint) of every counted TAKE
+        self.pos = 0 # trail entries before this position have been counted
+
+    def __len__(self):
+        return len(self.sets)
+
+    def push(self, vs, limit):
+        self.propagate()
+        c = len(self.sets)
+        self.sets.append(vs)
+        self.limits.append(limit)
+        self.counts.append(0)
+        for v in vs:
+            self.watch.setdefault(v, []).append(c)
+
+    # whether taking alive vertices of vs could still exceed a constraint,
+    # that is a constraint on one of them has more alive vertices than it
+    # has budget left
+    def binds(self, vs):
+        g = self.g
+        watch, sets, limits, counts = self.watch, self.sets, self.limits, self.counts
+        seen = set()
+        for v in vs:
+            for c in watch.get(v, ()):
+                if c not in seen:
+                    seen.add(c)
+                    alive = sum(1 for u in sets[c] if g.alive[u])
+                    if alive > limits[c] - counts[c]:
+                        return True
+        return False
+
+    # drop the last constraint, after undoing the graph to where it was pushed
+    def pop(self):
+        for v in self.sets.pop():
+            self.watch[v].pop()
+        self.limits.pop()
+        self.counts.pop()
+
+    def undo(self, mark):
+        log, counts = self.log, self.counts
+        while log and log[-1][0] >= mark:
+            counts[log.pop()[1]] -= 1
+        self.pos = min(self.pos, mark)
+
+    # the constraints as (vertices, budget), budget being how many more of
+    # the vertices may be taken
+    def budgets(self):
+        return [(vs, limit - count)
+                for vs, limit, count in zip(self.sets, self.limits, self.counts)]
+
+    # count the vertices taken since the last call, and once a constraint
+    # has reached its limit leave its other vertices out of the VC by
+    # taking their neighbors, which is counted in turn
+    # returns False as soon as a constraint is exceeded
+    def propagate(self):
+        g = self.g
+        trail = g.trail
+        watch, limits, counts, log = self.watch, self.limits, self.counts, self.log
+        while self.pos < len(trail):
+            tight = []
+            while self.pos < len(trail):
+                e = trail[self.pos]
+                if e & 3 == TAKE:
+                    for c in watch.get(e >> 2, ()):
+                        counts[c] += 1
+                        log.append((self.pos, c))
+                        if counts[c] > limits[c]:
+                            self.pos += 1
+                            return False
+                        if counts[c] == limits[c]:
+                            tight.append(c)
+                self.pos += 1
+            for c in tight:
+                for u in self.sets[c]:
+                    if g.alive[u]:
+                        for w in g.neighbors(u):
+                            g.take(w)
+                        g.drop(u)
+        return True
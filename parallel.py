@@ -0,0 +1,173 @@
+import os
+import time
+import multiprocessing as mp
+from timeit import default_timer as timer
+import common as c
+import kernel
+import branch
+import dispatch
+import lower_bounds
+import transposition
+import tree_dp
+from graph import Graph
+
+script_dir = os.path.dirname(__file__)
+input_dir = os.path.join(script_dir, "vc-exact-public")
+
+# split the search below g into tasks by expanding the top of the branching
+# tree breadth first until there are at least count open nodes
+# each task is the list of vertices taken on the way to an open node
+# returns the tasks and the smallest complete VC met on the way, if any
+def expand(g, count):
+    frontier = [[]]
+    found = None
+    while 0 < len(frontier) < count:
+        next_frontier = []
+        for takes in frontier:
+            mark = g.mark()
+            for v in takes:
+                g.take(v)
+            g.deg_one_redux()
+            if g.size == 0:
+                if found is None or g.taken < len(found):
+                    found = g.cover()
+                g.undo(mark)
+                continue
+
+            v = g.max_degree_vertex()
+            mirrors, satellites = c.mirrors_satellites(g, v)
+            if len(mirrors) > 1:
+                satellites = [v]
+            satellite_neighbors = set()
+            for u in satellites:
+                satellite_neighbors.update(g.neighbors(u))
+
+            # branch 1: M[v] in VC, branch 2: N(S[v]) in VC
+            prefix = g.cover()
+            next_frontier.append(prefix + mirrors)
+            next_frontier.append(prefix + list(satellite_neighbors))
+            g.undo(mark)
+        frontier = next_frontier
+    return (frontier, found)
+
+# state shared by the worker processes, set by init
+worker = {}
+
+def init(n, edges, ccs, incumbents, deadline):
+    g = Graph(n, edges)
+    worker.update(g=g, ccs=ccs, incumbents=incumbents, deadline=deadline,
+                  table=transposition.TranspositionTable())
+
+# solve one task of component i, returns (i, VC of the component or None,
+# whether the search timed out), the VC being the best one the task found
+# also on timeout
+def run_task(task):
+    i, takes = task
+    g, ccs, incumbent = worker["g"], worker["ccs"], worker["incumbents"][i]
+    mark = g.mark()
+    for j, cc in enumerate(ccs):
+        if j != i:
+            for u in cc:
+                g.hide(u)
+    for v in takes:
+        g.take(v)
+    timeout = None
+    if worker["deadline"] is not None:
+        timeout = max(0, worker["deadline"] - time.time())
+    timed_out = False
+    try:
+        vc = branch.search(g, incumbent.value - g.taken, timeout=timeout,
+                           incumbent=incumbent, table=worker["table"])
+        if vc is not None:
+            vc = takes + vc
+    except ValueError as err:
+        # the best VC of the search includes the vertices of takes
+        vc = err.args[1]
+        timed_out = True
+    g.undo(mark)
+    return (i, vc, timed_out)
+
+# parallel version of branch.solve
+# kernels of small treewidth are solved by the DP and the rest start from
+# the local search cover as branch.solve does; then the kernel is split into
+# its components and the top of each component's branching tree into tasks
+# for a process pool, and the workers of a component share its best VC size
+# so that every one of them prunes against it
+# on timeout a ValueError carries the size of the best VC found and the VC
+def solve(g, jobs=None, tasks_per_job=4, timeout=2 * 60):
+    if jobs is None:
+        jobs = os.cpu_count()
+    deadline = None
+    wall_deadline = None
+    if timeout is not None:
+        deadline = timer() + timeout
+        wall_deadline = time.time() + timeout
+    for v in g.loops:
+        if g.alive[v]:
+            g.take(v)
+    slv = set(g.cover())
+
+    k = kernel.Kernel(g.adjacency(), g.n + 1).reduce()
+    g, labels = k.graph()
+    if g.size == 0:
+        return slv.union(k.unfold([]))
+    if g.size <= dispatch.TW_MAX_EDGES:
+        vc = tree_dp.solve(g, deadline=deadline)
+        if vc is not None:
+            return slv.union(k.unfold(labels[v] for v in vc))
+    lb = lower_bounds.LPBound()(g)
+    ls = branch.first_cover(g, lb, deadline)
+    if len(ls.best) <= lb:
+        return slv.union(k.unfold(labels[v] for v in ls.best))
+    in_ls = set(ls.best)
+
+    # best VC so far and open tasks per component
+    ccs = g.components()
+    best = []
+    tasks = []
+    for i, cc in enumerate(ccs):
+        mark = g.mark()
+        for j, other in enumerate(ccs):
+            if j != i:
+                for u in other:
+                    g.hide(u)
+        best.append([v for v in cc if v in in_ls])
+        cc_tasks, found = expand(g, jobs * tasks_per_job)
+        if found is not None and len(found) < len(best[i]):
+            best[i] = found
+        tasks += [(i, takes) for takes in cc_tasks]
+        g.undo(mark)
+
+    incumbents = [mp.Value('i', len(vc)) for vc in best]
+    edges = list(g.edges())
+    timed_out = False
+    with mp.Pool(jobs, initializer=init,
+                 initargs=(g.n, edges, ccs, incumbents, wall_deadline)) as pool:
+        for i, vc, task_timed_out in pool.imap_unordered(run_task, tasks):
+            timed_out = timed_out or task_timed_out
+            if vc is not None and len(vc) < len(best[i]):
+                best[i] = vc
+    vc = [v for cc_vc in best for v in cc_vc]
+    vc = slv.union(k.unfold(labels[v] for v in vc))
+    if timed_out:
+        raise ValueError(len(vc), vc)
+    return vc
+
+
+if __name__ == "__main__":
+    with open("parallel_output.txt", 'w') as output:
+        output.write("file_name vc_size run_time\n")
+        with os.scandir(input_dir) as dir:
+            for file in dir:
+                with open(file, encoding="latin-1") as f:
+                    start = timer()
+                    g = c.parse_graph(f, compact=True)
+                    try:
+                        sol = len(solve(g))
+                    except ValueError as err:
+                        sol = err.args[0]
+                    run_time = timer() - start
+                    data = ' '.join([str(file.name), str(sol), str(run_time)])
+                    output.write(data + '\n')
+                    print(str(file.name) + " done")
+                    print(sol, run_time)
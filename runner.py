@@ -0,0 +1,169 @@
+import os
+import argparse
+import resource
+import tempfile
+import multiprocessing as mp
+from multiprocessing.connection import wait
+from timeit import default_timer as timer
+import common as c
+import branch
+import checkpoint
+import ilp
+import simple
+import explore
+import features
+import solution_cache
+
+script_dir = os.path.dirname(__file__)
+input_dir = os.path.join(script_dir, "vc-exact-public")
+
+# SolutionCache used by the solvers, set in the child processes by work
+solutions = None
+# whether branch saves its search to and resumes it from checkpoint_dir
+checkpoints = False
+
+# each solver reads one instance file and returns a list of result fields
+def run_branch(f):
+    g = c.parse_graph(f, compact=True)
+    path = checkpoint.path(f.name) if checkpoints else None
+    return [len(branch.solve(g, timeout=None, solutions=solutions, checkpoint_path=path))]
+
+def run_ilp(f):
+    return [ilp.solve(f, solutions)]
+
+def run_simple(f):
+    return simple.reduced_info(f, solutions)
+
+def run_explore(f):
+    return explore.detail_info(f)
+
+def run_features(f):
+    return features.row(features.extract(*c.load_edges(f)))
+
+SOLVERS = {
+    "branch": (run_branch, ["vc_size"]),
+    "ilp": (run_ilp, ["vc_size"]),
+    "simple": (run_simple, ["num_vertices", "num_edges", "min_deg", "max_deg",
+                            "treewidth", "approx_vc"]),
+    "explore": (run_explore, ["min_deg", "max_deg", "treewidth", "approx_vc"]),
+    "features": (run_features, features.COLUMNS),
+}
+
+# runs in a child process, sends (status, fields, run_time, max_rss_mb)
+def work(solver, path, memory, cache, use_solutions, use_checkpoints, conn):
+    global solutions, checkpoints
+    c.use_cache = cache
+    if use_solutions:
+        solutions = solution_cache.SolutionCache()
+    checkpoints = use_checkpoints
+    if memory:
+        limit = memory * 2**20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    start = timer()
+    try:
+        with open(path, encoding="latin-1") as f:
+            fields = SOLVERS[solver][0](f)
+        status = "ok"
+    except MemoryError:
+        fields = []
+        status = "memout"
+    except Exception as err:
+        fields = [type(err).__name__]
+        status = "error"
+    run_time = timer() - start
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    conn.send((status, fields, run_time, rss))
+    conn.close()
+
+# write the table to a temporary file and move it into place, so the
+# output is always a complete table
+def write_results(output, header, results):
+    dir = os.path.dirname(os.path.abspath(output))
+    fd, tmp = tempfile.mkstemp(dir=dir, prefix=".runner-")
+    with os.fdopen(fd, 'w') as out:
+        out.write(' '.join(header) + '\n')
+        for name in sorted(results):
+            out.write(' '.join([name] + [str(x) for x in results[name]]) + '\n')
+    os.replace(tmp, output)
+
+# run solver on every path with at most jobs instances at a time
+# instances running longer than timeout seconds are killed, and memory caps
+# each instance's address space in MB
+# cache keeps parsed instances in c.cache_dir for later runs, and
+# use_solutions lets the solvers answer from and fill the solution cache, and
+# use_checkpoints lets branch continue searches killed in an earlier run
+def run(solver, paths, output, jobs=None, timeout=None, memory=None, cache=False,
+        use_solutions=False, use_checkpoints=False):
+    if jobs is None:
+        jobs = os.cpu_count()
+    header = ["file_name", "status", "run_time", "max_rss_mb"] + SOLVERS[solver][1]
+    pending = list(reversed(paths))
+    running = {} # connection -> (process, name, start)
+    results = {}
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            path = pending.pop()
+            recv, send = mp.Pipe(duplex=False)
+            p = mp.Process(target=work, daemon=True,
+                           args=(solver, path, memory, cache, use_solutions,
+                                 use_checkpoints, send))
+            p.start()
+            send.close()
+            running[recv] = (p, os.path.basename(path), timer())
+
+        # wait until an instance finishes or the next deadline passes
+        wait_time = None
+        if timeout is not None:
+            now = timer()
+            wait_time = max(0, min(start + timeout - now for _, _, start in running.values()))
+        for conn in wait(list(running), wait_time):
+            p, name, start = running.pop(conn)
+            try:
+                status, fields, run_time, rss = conn.recv()
+            except EOFError:
+                # killed from outside, e.g. by the OOM killer
+                status, fields, run_time, rss = "crash", [], timer() - start, 0
+            conn.close()
+            p.join()
+            results[name] = [status, round(run_time, 5), round(rss, 1)] + fields
+            write_results(output, header, results)
+            print(name, status, run_time, fields)
+
+        if timeout is not None:
+            now = timer()
+            for conn in [conn for conn, (_, _, start) in running.items()
+                         if now - start > timeout]:
+                p, name, start = running.pop(conn)
+                p.kill()
+                p.join()
+                conn.close()
+                results[name] = ["timeout", round(now - start, 5), 0]
+                write_results(output, header, results)
+                print(name, "timeout")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="run a solver over instance files in parallel")
+    parser.add_argument("solver", choices=sorted(SOLVERS))
+    parser.add_argument("files", nargs='*',
+                        help="instance files, all of vc-exact-public by default")
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    parser.add_argument("-t", "--timeout", type=float, default=None, help="seconds per instance")
+    parser.add_argument("-m", "--memory", type=int, default=None, help="MB per instance")
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument("-c", "--cache", action="store_true",
+                        help="cache parsed instances in " + c.cache_dir)
+    parser.add_argument("-s", "--solutions", action="store_true",
+                        help="reuse and store solutions in " + solution_cache.solution_dir)
+    parser.add_argument("-k", "--checkpoints", action="store_true",
+                        help="save and resume branch searches in " + checkpoint.checkpoint_dir)
+    args = parser.parse_intermixed_args()
+
+    paths = args.files
+    if not paths:
+        with os.scandir(input_dir) as dir:
+            paths = sorted(file.path for file in dir)
+    output = args.output or (args.solver + "_runner_output.txt")
+    run(args.solver, paths, output, args.jobs, args.timeout, args.memory, args.cache,
+        args.solutions, args.checkpoints)
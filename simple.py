@@ -1,52 +1,52 @@
 import os
-import networkx as nx
-import networkx.algorithms.approximation as naa
+import numpy as np
+from timeit import default_timer as timer
 import common as c
+import features
+import solution_cache
 
 script_dir = os.path.dirname(__file__)
 input_dir = os.path.join(script_dir, "vc-exact-public")
 
-# simple degree 1 reduction
-def deg_one_redux(graph):
-    vc = set()
-    keep_going = True
-    while keep_going:
-        keep_going = False
-        for v, d in graph.degree():
-            if d == 1:
-                u = [u for u in graph[v]][0]
-                vc.add(u)
-                leaves = []
-                for w in graph[u]:
-                    if graph.degree[w] == 1:
-                        leaves.append(w)
-                graph.remove_node(u)
-                for w in leaves:
-                    graph.remove_node(w)
-                keep_going = True
-                break
-    return (vc, graph)
+# graph info after self loops and the linear-time degree-one reduction of
+# features.reduce
+# returns [num_vertices, num_edges, min_deg, max_deg, treewidth, approx_vc]
+# of the vertices left with edges, the treewidth being an upper bound or "-"
+# if the graph is too large for it, or [vc_size] if the reduction solves
+# the instance
+# solutions is an optional SolutionCache; instances solved by the reduction
+# are answered from it and stored into it
+def reduced_info(f, solutions=None):
+    start = timer()
+    n, edges = c.load_edges(f)
+    if solutions is not None:
+        key = solution_cache.fingerprint(n, edges)
+        entry = solutions.lookup(key, n, edges)
+        if entry is not None and entry["solver"] == "simple":
+            return [entry["size"]]
+    vc, rest = features.reduce(n, *features.normalize(edges))
+    if len(rest) == 0:
+        if solutions is not None:
+            solutions.put(key, n, edges, vc.tolist(), "simple", timer() - start)
+        return [len(vc)]
+    fs = features.extract(n, rest, kernelize=False)
+    deg = np.bincount(rest.ravel())
+    deg = deg[deg > 0]
+    tw = "-" if fs["treewidth_ub"] is None else fs["treewidth_ub"]
+    return [len(deg), len(rest), int(deg.min()), int(deg.max()), tw, fs["approx_vc"]]
 
 if __name__ == "__main__":
+    solutions = solution_cache.SolutionCache()
     with open("simple_output.txt", 'w') as output:
         output.write("file_name num_vertices num_edges " \
                    + "min_deg max_deg treewidth approx_vc\n")
         with os.scandir(input_dir) as dir:
             for file in dir:
                 with open(file, encoding="latin-1") as f:
-                    g = c.parse_graph(f)
-                    vc, g = deg_one_redux(g)
-                    if g.number_of_nodes() > 0:
-                        v = g.number_of_nodes()
-                        e = g.number_of_edges()
-                        min_deg = min(d for v, d in g.degree())
-                        max_deg = max(d for v, d in g.degree())
-                        tw = naa.treewidth_min_degree(g)[0]
-                        approx_vc = len(naa.min_weighted_vertex_cover(g))
-                        data = ' '.join([str(file.name), str(v), str(e), \
-                                         str(min_deg), str(max_deg), \
-                                         str(tw), str(approx_vc)])
+                    info = reduced_info(f, solutions)
+                    if len(info) > 1:
+                        data = ' '.join([str(file.name)] + [str(x) for x in info])
                         output.write(data + '\n')
                     else:
                         print("Vertex cover found for " + str(file.name))
-                        print(len(vc))
+                        print(info[0])
@@ -0,0 +1,89 @@
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+
+script_dir = os.path.dirname(__file__)
+solution_dir = os.path.join(script_dir, "solutions")
+
+# canonical hash of the graph on vertices 1..n with the given edges
+# edges are normalized to u <= v, deduplicated and sorted, so the hash does
+# not depend on edge order, edge direction or repeated edges
+def fingerprint(n, edges):
+    e = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    e = np.unique(np.sort(e, axis=1), axis=0)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.int64(n).tobytes())
+    h.update(np.ascontiguousarray(e).tobytes())
+    return h.hexdigest()
+
+# edges of the compact graph g, with self-loops, as an array
+def graph_edges(g):
+    edges = list(g.edges()) + [(v, v) for v in g.loops]
+    return np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+# whether cover is a VC of the graph on vertices 1..n with the given edges
+def is_cover(n, edges, cover):
+    in_cover = np.zeros(n + 1, dtype=bool)
+    cover = np.asarray(list(cover), dtype=np.int64)
+    if len(cover) and (cover.min() < 1 or cover.max() > n):
+        return False
+    in_cover[cover] = True
+    e = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    return bool((in_cover[e[:, 0]] | in_cover[e[:, 1]]).all())
+
+# persistent store of the best known VC of each instance, one JSON file per
+# fingerprint holding the cover, its size, the solver that found it, the
+# time it took and whether it is known to be optimal
+class SolutionCache:
+    def __init__(self, dir=solution_dir):
+        self.dir = dir
+
+    def path(self, key):
+        return os.path.join(self.dir, key + ".json")
+
+    def get(self, key):
+        try:
+            with open(self.path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # cached entry for the instance if its cover checks out, else None
+    # entries whose cover is not a VC of the instance are removed
+    def lookup(self, key, n, edges):
+        entry = self.get(key)
+        if entry is None:
+            return None
+        cover = entry.get("cover")
+        if cover is None or len(set(cover)) != entry.get("size") \
+           or not is_cover(n, edges, cover):
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+            return None
+        return entry
+
+    # store cover of the instance unless it is no VC of it or the cache
+    # already holds a valid one at least as good
+    # returns whether cover was stored
+    def put(self, key, n, edges, cover, solver, run_time, optimal=True):
+        cover = sorted(set(int(v) for v in cover))
+        if not is_cover(n, edges, cover):
+            return False
+        old = self.lookup(key, n, edges)
+        if old is not None:
+            if old["optimal"] and not optimal:
+                return False
+            if old["optimal"] == optimal and old["size"] <= len(cover):
+                return False
+        entry = {"size": len(cover), "cover": cover, "solver": solver,
+                 "time": run_time, "optimal": optimal}
+        os.makedirs(self.dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.dir, prefix=".solution-")
+        with os.fdopen(fd, 'w') as out:
+            json.dump(entry, out)
+        os.replace(tmp, self.path(key))
+        return True
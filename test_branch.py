@@ -0,0 +1,69 @@
+import os
+import random
+import pytest
+import common as c
+import branch
+import engine
+import instrument
+import solution_cache
+from graph import Graph
+
+# instances that branch.solve cannot finish within a few seconds
+HARD = ["vc-exact_009.hgr", "vc-exact_053.hgr"]
+
+# graph on vertices 1..n with each edge present with probability p
+def random_graph(n, p, seed):
+    rng = random.Random(seed)
+    return [(u, v) for u in range(1, n + 1) for v in range(u + 1, n + 1) if rng.random() < p]
+
+# a search stopped early has no result, even though some node has finished
+@pytest.mark.parametrize("seed", range(5))
+def test_result_only_when_done(seed):
+    n = 60
+    edges = random_graph(n, 0.1, seed)
+    s = engine.Search(Graph(n, edges), n + 1, small=0)
+    while not s.run(nodes=5):
+        assert s.result is None
+    assert solution_cache.is_cover(n, edges, s.result)
+
+# the VC carried by the ValueError of a timeout covers the instance
+@pytest.mark.parametrize("name", HARD)
+@pytest.mark.parametrize("timeout", [0.2, 1.5])
+def test_timeout_cover(name, timeout):
+    path = os.path.join(c.input_dir, name)
+    if not os.path.exists(path):
+        pytest.skip("instance not available")
+    with open(path, encoding="latin-1") as f:
+        n, edges = c.load_edges(f)
+    g = c.build_graph(n, edges, True)
+    try:
+        vc = branch.solve(g, timeout=timeout)
+    except ValueError as err:
+        size, vc = err.args
+        assert size == len(vc)
+    assert solution_cache.is_cover(n, edges, vc)
+
+# components left over in several branches are answered from the table under
+# the default settings, where packing constraints are pushed on every branch
+def test_table_hits():
+    path = os.path.join(c.input_dir, "vc-exact_053.hgr")
+    if not os.path.exists(path):
+        pytest.skip("instance not available")
+    with open(path, encoding="latin-1") as f:
+        g = c.parse_graph(f, compact=True)
+    profile = instrument.Profile()
+    try:
+        branch.solve(g, profile, timeout=3)
+    except ValueError:
+        pass
+    assert profile.counts["table"] > 0
+
+# the profile counts the nodes of the bitset search like those of the engine
+@pytest.mark.parametrize("small", [0, 100])
+def test_profile_counts_bitset_nodes(small):
+    n = 80
+    edges = random_graph(n, 0.08, 1)
+    profile = instrument.Profile()
+    s = engine.Search(Graph(n, edges), n + 1, profile=profile, small=small)
+    assert s.run()
+    assert profile.nodes == s.nodes == sum(profile.depths.values())
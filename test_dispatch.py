@@ -0,0 +1,39 @@
+import random
+import dispatch
+import engine
+import instrument
+import solution_cache
+from graph import Graph
+
+# graph on vertices 1..n with each edge present with probability p
+def random_graph(n, p, seed):
+    rng = random.Random(seed)
+    return [(u, v) for u in range(1, n + 1) for v in range(u + 1, n + 1) if rng.random() < p]
+
+# a dense component goes to the complement max-clique search, which finds
+# a minimum VC
+def test_dense_component_to_clique():
+    n = 60
+    edges = random_graph(n, 0.3, 0)
+    g = Graph(n, edges)
+    f = dispatch.features(g, g.matching_cover())
+    assert f["density"] >= dispatch.THRESHOLDS["clique_min_density"]
+    assert dispatch.Dispatcher().choose(f) == "clique"
+
+    profile = instrument.Profile()
+    vc, optimal = dispatch.solve(g, g.matching_cover(), profile=profile,
+                                 dispatcher=dispatch.Dispatcher())
+    assert profile.counts["dispatch_clique"] == 1
+    s = engine.Search(Graph(n, edges), n + 1)
+    assert s.run()
+    assert optimal and len(vc) == len(s.result)
+    assert solution_cache.is_cover(n, edges, vc)
+
+# the large sparse kernels of vc-exact_169-173 go neither to it nor to CBC,
+# which crashes on them
+def test_large_sparse_component_to_bnb():
+    f = {"num_vertices": 1534, "num_edges": 126163, "density": 0.107, "treewidth": None,
+         "gap": 100}
+    assert dispatch.Dispatcher().choose(f) == "bnb"
+    model = {"feature": "gap", "threshold": 10, "low": "bnb", "high": "ilp"}
+    assert dispatch.Dispatcher(model=model).choose(f) == "bnb"
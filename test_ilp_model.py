@@ -0,0 +1,31 @@
+import random
+import pytest
+import engine
+import ilp_model
+import solution_cache
+from graph import Graph
+
+# graph on vertices 1..n with each edge present with probability p
+def random_graph(n, p, seed):
+    rng = random.Random(seed)
+    return [(u, v) for u in range(1, n + 1) for v in range(u + 1, n + 1) if rng.random() < p]
+
+# the separated clique and odd-cycle rows keep every minimum VC feasible
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("cuts", [False, True])
+def test_minimum_cover(seed, cuts):
+    n = 40
+    edges = random_graph(n, 0.15, seed)
+    vc, optimal = ilp_model.solve(Graph(n, edges), cuts=cuts)
+    s = engine.Search(Graph(n, edges), n + 1)
+    assert s.run()
+    assert optimal and len(vc) == len(s.result)
+    assert solution_cache.is_cover(n, edges, vc)
+
+# the rows are violated by the all-half LP solution
+def test_cut_rows_cut_off_half():
+    n = 40
+    g = Graph(n, random_graph(n, 0.15, 0))
+    rows = ilp_model.cut_rows(g)
+    assert rows
+    assert all(len(vs) / 2 < rhs for vs, rhs in rows)
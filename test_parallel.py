@@ -0,0 +1,37 @@
+import os
+import random
+import pytest
+import common as c
+import engine
+import parallel
+import solution_cache
+from graph import Graph
+
+# graph on vertices 1..n with each edge present with probability p
+def random_graph(n, p, seed):
+    rng = random.Random(seed)
+    return [(u, v) for u in range(1, n + 1) for v in range(u + 1, n + 1) if rng.random() < p]
+
+# too wide for the DP, so the workers do the search
+@pytest.mark.parametrize("seed", range(3))
+def test_minimum_cover(seed):
+    n = 50
+    edges = random_graph(n, 0.3, seed)
+    vc = parallel.solve(Graph(n, edges), jobs=2)
+    s = engine.Search(Graph(n, edges), n + 1)
+    assert s.run()
+    assert solution_cache.is_cover(n, edges, vc) and len(vc) == len(s.result)
+
+# on timeout the VC is made up of the workers' best covers, starting from
+# the local search cover rather than the 2-approx one of 182 vertices
+def test_timeout_cover():
+    path = os.path.join(c.input_dir, "vc-exact_009.hgr")
+    if not os.path.exists(path):
+        pytest.skip("instance not available")
+    with open(path, encoding="latin-1") as f:
+        n, edges = c.load_edges(f)
+    with pytest.raises(ValueError) as err:
+        parallel.solve(c.build_graph(n, edges, True), jobs=2, timeout=3)
+    size, vc = err.value.args
+    assert size == len(vc) <= 140
+    assert solution_cache.is_cover(n, edges, vc)
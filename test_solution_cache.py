@@ -0,0 +1,29 @@
+import branch
+import solution_cache
+from graph import Graph
+
+# a 5-cycle with a pendant vertex, minimum VC size 3
+N = 6
+EDGES = [(1, 2), (2, 3), (3, 4), (4, 5), (5, 1), (1, 6)]
+
+def test_put_rejects_invalid_cover(tmp_path):
+    cache = solution_cache.SolutionCache(str(tmp_path))
+    key = solution_cache.fingerprint(N, EDGES)
+    assert cache.put(key, N, EDGES, [1, 2, 3, 4, 5], "test", 0, optimal=False)
+    # smaller, but leaves edges uncovered
+    assert not cache.put(key, N, EDGES, [1, 3], "test", 0, optimal=False)
+    entry = cache.lookup(key, N, EDGES)
+    assert entry is not None and entry["size"] == 5
+    assert cache.put(key, N, EDGES, [1, 3, 4], "test", 0)
+    assert cache.lookup(key, N, EDGES)["size"] == 3
+
+# a non-optimal entry of minimum size is proven optimal without being beaten
+def test_warm_start_of_minimum_size(tmp_path):
+    cache = solution_cache.SolutionCache(str(tmp_path))
+    g = Graph(N, EDGES)
+    edges = solution_cache.graph_edges(g)
+    key = solution_cache.fingerprint(N, edges)
+    cache.put(key, N, edges, [1, 3, 4], "test", 0, optimal=False)
+    vc = branch.solve(g, timeout=None, solutions=cache)
+    assert len(vc) == 3 and solution_cache.is_cover(N, EDGES, vc)
+    assert cache.lookup(key, N, edges)["optimal"]
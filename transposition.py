@@ -0,0 +1,60 @@
+import hashlib
+from array import array
+from collections import OrderedDict
+
+# components with more vertices are not looked up or stored
+MAX_VERTICES = 64
+# entries kept before the least recently used ones are evicted, so the
+# table holds at most MAX_ENTRIES covers of at most MAX_VERTICES vertices
+MAX_ENTRIES = 50000
+
+# bounded LRU table of solved components for the branch-and-bound
+# a component is identified by a hash of its edge set, which is the same
+# whenever the same component is left over in another branch
+# an entry holds either a minimum VC of the component, or only a lower bound
+# on its size when the search found no VC below the bound it was given
+class TranspositionTable:
+    def __init__(self, max_vertices=MAX_VERTICES, max_entries=MAX_ENTRIES):
+        self.max_vertices = max_vertices
+        self.max_entries = max_entries
+        self.entries = OrderedDict() # key -> (size or lower bound, VC or None)
+        self.hits = 0
+
+    # key of the component cc, the only alive vertices of g reachable from cc
+    def key(self, g, cc):
+        edges = array('l')
+        for v in sorted(cc):
+            for u in g.neighbors(v):
+                if u > v:
+                    edges.append(v)
+                    edges.append(u)
+        return hashlib.blake2b(edges.tobytes(), digest_size=16).digest()
+
+    # answer for a component needing a VC smaller than ub
+    # returns (whether the table knows the answer, minimum VC or None)
+    def lookup(self, key, ub):
+        entry = self.entries.get(key)
+        if entry is None:
+            return (False, None)
+        size, vc = entry
+        if vc is None and size < ub:
+            return (False, None)
+        self.entries.move_to_end(key)
+        self.hits += 1
+        if vc is not None and size < ub:
+            return (True, vc)
+        return (True, None)
+
+    # record the result of a search for a VC smaller than ub
+    def store(self, key, ub, vc):
+        if vc is not None:
+            entry = (len(vc), list(vc))
+        else:
+            old = self.entries.get(key)
+            if old is not None and (old[1] is not None or old[0] >= ub):
+                return
+            entry = (ub, None)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
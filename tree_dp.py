@@ -0,0 +1,168 @@
+from timeit import default_timer as timer
+import numpy as np
+import networkx as nx
+import networkx.algorithms.approximation as naa
+
+# decompositions wider than this are not solved, a table has 2^(width + 1)
+# entries and every node of the nice decomposition keeps its table
+MAX_WIDTH = 14
+
+# nice tree decomposition node kinds
+LEAF = 0 # empty bag
+INTRODUCE = 1 # bag of the child plus one vertex
+FORGET = 2 # bag of the child minus one vertex
+JOIN = 3 # same bag as both children
+
+INF = 1 << 30
+
+# tree decomposition of g of the smaller width found by the min-degree and,
+# if that is over max_width but not by more than a factor of two, the slower
+# min-fill-in heuristic
+# returns (width, decomposition as a networkx tree of frozenset bags)
+def decompose(g, max_width=MAX_WIDTH):
+    nxg = nx.Graph()
+    nxg.add_nodes_from(g.vertices())
+    nxg.add_edges_from(g.edges())
+    width, tree = naa.treewidth_min_degree(nxg)
+    if max_width < width <= 2 * max_width:
+        fill_width, fill_tree = naa.treewidth_min_fill_in(nxg)
+        if fill_width < width:
+            width, tree = fill_width, fill_tree
+    return (width, tree)
+
+# nice tree decomposition built from tree, rooted at an empty bag
+# each node has a kind, the vertex introduced or forgotten, its bag as an
+# ordered list, bit i of a table index standing for the i-th vertex, and its
+# children; node 0 is the root and every child comes after its parent
+class NiceDecomposition:
+    def __init__(self, tree):
+        self.kind = []
+        self.vertex = []
+        self.bag = []
+        self.children = []
+
+        # (parent node or -1, bag of the next node down, decomposition node
+        # or None for a leaf, decomposition node it was reached from)
+        stack = [(-1, [], next(iter(tree.nodes)), None)]
+        while stack:
+            node, order, td, from_td = stack.pop()
+            bag = td if td is not None else frozenset()
+            # going down from order, introduce nodes drop the vertices not
+            # in bag and forget nodes add the vertices of bag not in order
+            for v in [v for v in order if v not in bag]:
+                node = self.add(node, INTRODUCE, v, order)
+                order = [u for u in order if u != v]
+            for v in sorted(bag - set(order)):
+                node = self.add(node, FORGET, v, order)
+                order = order + [v]
+
+            if td is None:
+                self.add(node, LEAF, None, order)
+                continue
+            subtrees = [u for u in tree.neighbors(td) if u != from_td]
+            if not subtrees:
+                stack.append((node, order, None, td))
+                continue
+            # a chain of joins with one subtree hanging off each
+            for u in subtrees[:-1]:
+                node = self.add(node, JOIN, None, order)
+                stack.append((node, order, u, td))
+            stack.append((node, order, subtrees[-1], td))
+
+    def add(self, parent, kind, v, order):
+        self.kind.append(kind)
+        self.vertex.append(v)
+        self.bag.append(list(order))
+        self.children.append([])
+        x = len(self.kind) - 1
+        if parent >= 0:
+            self.children[parent].append(x)
+        return x
+
+# minimum VC of the compact graph g by dynamic programming over a nice tree
+# decomposition, or None if g's decomposition is wider than max_width or
+# deadline (a timer() value) passes first
+# the table of a node holds, for every subset of its bag given as a bitmask,
+# the size of a minimum VC of the graph below the node that contains
+# exactly that subset of the bag, INF if the subset leaves a bag edge
+# uncovered
+def solve(g, max_width=MAX_WIDTH, deadline=None):
+    if g.size == 0:
+        return []
+    width, tree = decompose(g, max_width)
+    if width > max_width:
+        return None
+    if deadline is not None and timer() > deadline:
+        return None
+    nice = NiceDecomposition(tree)
+    kind, vertex, bag, children = nice.kind, nice.vertex, nice.bag, nice.children
+    tables = [None] * len(kind)
+    masks = np.arange(1 << (width + 1))
+    popcount = np.zeros(len(masks), dtype=np.int64)
+    for i in range(width + 1):
+        popcount += (masks >> i) & 1
+    # the child bag of a FORGET node and the bag of an INTRODUCE node only
+    # differ from the node's other bag by the vertex, which has this index
+    position = [0] * len(kind)
+
+    for x in range(len(kind) - 1, -1, -1):
+        if deadline is not None and x % 64 == 0 and timer() > deadline:
+            return None
+        k = kind[x]
+        if k == LEAF:
+            tables[x] = np.zeros(1, dtype=np.int64)
+        elif k == INTRODUCE:
+            child = children[x][0]
+            child_bag = bag[child]
+            v = vertex[x]
+            i = bag[x].index(v)
+            position[x] = i
+            # neighbors of v in the bag, as bits of the child's bag
+            nb = 0
+            for j, u in enumerate(child_bag):
+                if g.has_edge(u, v):
+                    nb |= 1 << j
+            t = tables[child]
+            left_out = np.where((masks[:len(t)] & nb) == nb, t, INF)
+            low = 1 << i
+            shape = (len(t) // low, 1, low)
+            taken = np.minimum(t + 1, INF)
+            tables[x] = np.concatenate([left_out.reshape(shape), taken.reshape(shape)],
+                                       axis=1).reshape(-1)
+        elif k == FORGET:
+            child = children[x][0]
+            i = bag[child].index(vertex[x])
+            position[x] = i
+            t = tables[child]
+            low = 1 << i
+            tables[x] = t.reshape(len(t) // (2 * low), 2, low).min(axis=1).reshape(-1)
+        else:
+            a, b = children[x]
+            t = tables[a] + tables[b] - popcount[:len(tables[a])]
+            tables[x] = np.minimum(t, INF)
+
+    # walk down from the root choosing the bag subsets that give the optimum
+    vc = set()
+    stack = [(0, 0)]
+    while stack:
+        x, mask = stack.pop()
+        k = kind[x]
+        if k == LEAF:
+            continue
+        child = children[x][0]
+        i = position[x]
+        low = mask & ((1 << i) - 1)
+        high = mask >> i
+        if k == INTRODUCE:
+            if high & 1:
+                vc.add(vertex[x])
+            stack.append((child, ((high >> 1) << i) | low))
+        elif k == FORGET:
+            without = ((high << 1) << i) | low
+            with_v = without | (1 << i)
+            t = tables[child]
+            stack.append((child, without if t[without] <= t[with_v] else with_v))
+        else:
+            for child in children[x]:
+                stack.append((child, mask))
+    return list(vc)